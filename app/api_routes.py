@@ -4,31 +4,36 @@ API Routes for immich-drop extensions
 - Batch upload for iOS Shortcuts
 """
 from fastapi import APIRouter, HTTPException, UploadFile, File, Form, BackgroundTasks, Request
-from fastapi.responses import JSONResponse
-from typing import List, Optional
+from fastapi.responses import JSONResponse, Response
+from typing import BinaryIO, List, Optional, Union
 from pydantic import BaseModel
-from datetime import datetime
+from pydantic_core import from_json
+from datetime import datetime, timezone
 import hashlib
 import httpx
 import os
-import base64
+import binascii
 import logging
 import mimetypes
 import asyncio
+import random
+import re
+import tempfile
+import time
 
 logger = logging.getLogger("immich_drop.api_routes")
 
 from .url_downloader import (
     download_from_url,
     download_from_url_multi,
-    download_multiple_urls,
+    iter_multiple_urls,
     cleanup_download,
     identify_platform,
     is_direct_image_url,
     SUPPORTED_PATTERNS,
 )
 from .cookie_manager import get_cookie_file_for_platform
-from .utils import detect_file_type
+from .utils import detect_file_type, new_sha1
 from .job_manager import create_job, get_job, update_job, cleanup_expired
 
 
@@ -104,130 +109,540 @@ class JobStatusResponse(BaseModel):
 # Helper Functions
 # ============================================================================
 
+def _utc_now_iso() -> str:
+    """Current UTC time as an Immich-style ISO-8601 string with a Z suffix."""
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+def _timestamp_iso(timestamp: float) -> str:
+    """Epoch seconds as an Immich-style UTC ISO-8601 string with a Z suffix."""
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+def _fallback_filename() -> str:
+    """Name for uploads that arrive without one (ns clock, no datetime alloc)."""
+    return f"upload_{time.time_ns()}"
+
+
+def _sha1_hex(file_content: Union[bytes, BinaryIO]) -> str:
+    """SHA-1 of an in-memory blob or a seekable file handle.
+
+    File handles are hashed with hashlib.file_digest (in C, reused buffer) and
+    rewound afterwards so the same handle can be streamed to Immich without
+    holding the body in RAM.
+    """
+    if isinstance(file_content, (bytes, bytearray, memoryview)):
+        return new_sha1(file_content).hexdigest()
+    file_content.seek(0)
+    digest = hashlib.file_digest(file_content, new_sha1).hexdigest()
+    file_content.seek(0)
+    return digest
+
+
+def _open_for_upload(path: str) -> tuple[BinaryIO, int]:
+    """Open a downloaded file for one sequential read; returns it and its size.
+
+    Blocking (open, fstat, fadvise): run via asyncio.to_thread.
+    """
+    f = open(path, "rb")
+    if hasattr(os, "posix_fadvise"):
+        # One front-to-back pass: let the kernel read ahead aggressively
+        os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+    return f, os.fstat(f.fileno()).st_size
+
+
+def _sha1_file(path: str) -> str:
+    """SHA-1 of a file on disk (blocking; run via asyncio.to_thread)."""
+    with open(path, "rb") as f:
+        return _sha1_hex(f)
+
+
+# Extensions trusted as-is on base64 uploads; anything else gets the sniffed one
+_KNOWN_MEDIA_EXTENSIONS = frozenset({
+    '.jpg', '.jpeg', '.png', '.gif', '.webp', '.heic', '.avif', '.mp4', '.mov', '.bmp', '.tiff',
+})
+
+_B64_CHUNK_CHARS = 1024 * 1024  # multiple of 4, so slices decode independently
+_B64_NON_ALPHABET = re.compile(r"[^A-Za-z0-9+/=]")
+_B64_PAD_RUN = re.compile(r"=+")
+
+
+def _b64_pad_end(chunk: str) -> int:
+    """Index of the first '=' run that completes a quad in `chunk`, or -1.
+
+    `chunk` starts on a quad boundary. Mirrors `binascii.a2b_base64`: padding
+    only counts after 2 or 3 data characters of a quad, and decoding stops
+    once it completes one; any other '=' is skipped.
+    """
+    for m in _B64_PAD_RUN.finditer(chunk):
+        pos = (m.start() - chunk.count("=", 0, m.start())) % 4
+        if pos >= 2 and pos + len(m.group()) >= 4:
+            return m.start()
+    return -1
+
+
+def _decode_base64(data_str: str, start: int = 0) -> tuple[BinaryIO, str, tuple]:
+    """Decode base64 text into an anonymous temp file, hashing as it goes.
+
+    Works in ~1 MiB slices so the decoded payload never sits in memory next
+    to the request string. Accepts what `base64.b64decode` accepts: characters
+    outside the base64 alphabet (e.g. line breaks from iOS Shortcuts) and
+    stray '=' are dropped, and anything after completed padding is ignored.
+    Returns the rewound file, its SHA-1 hex and the magic-byte file type;
+    the caller closes the file. Blocking: run via asyncio.to_thread.
+    """
+    out = tempfile.TemporaryFile()
+    h = new_sha1()
+    carry = ""
+    try:
+        for i in range(start, len(data_str), _B64_CHUNK_CHARS):
+            chunk = carry + _B64_NON_ALPHABET.sub("", data_str[i:i + _B64_CHUNK_CHARS])
+            end = _b64_pad_end(chunk)
+            if end >= 0:
+                body = chunk[:end].replace("=", "")
+                decoded = binascii.a2b_base64(body + "=" * (-len(body) % 4))
+                h.update(decoded)
+                out.write(decoded)
+                carry = ""
+                break
+            # A trailing '=' run may continue in the next slice; keep it
+            trail = len(chunk) - len(chunk.rstrip("="))
+            body = chunk[:len(chunk) - trail].replace("=", "")
+            cut = len(body) - len(body) % 4
+            carry = body[cut:] + "=" * trail
+            decoded = binascii.a2b_base64(body[:cut])
+            h.update(decoded)
+            out.write(decoded)
+        if carry.rstrip("="):
+            # Leftover partial quad: raises the same error b64decode would
+            binascii.a2b_base64(carry.rstrip("="))
+            raise binascii.Error("Incorrect padding")
+    except Exception:
+        out.close()
+        raise
+    out.seek(0)
+    file_type = detect_file_type(out.read(32))
+    out.seek(0)
+    return out, h.hexdigest(), file_type
+
+
+UPLOAD_MAX_ATTEMPTS = 3
+# Large bodies get a long read/write budget; no pool timeout because callers
+# already bound concurrency with a semaphore, so waiting for a slot is expected.
+UPLOAD_TIMEOUT = httpx.Timeout(300.0, connect=10.0, pool=None)
+
+
+class _FileBody:
+    """read/seek/tell view of a file handle for an httpx multipart part.
+
+    httpx sizes a part via fileno() when it exists; on Starlette's
+    SpooledTemporaryFile that forces a rollover, copying small in-memory
+    uploads to disk. Without fileno() httpx falls back to tell()/seek().
+    """
+
+    def __init__(self, fileobj: BinaryIO) -> None:
+        self._f = fileobj
+
+    def read(self, size: int = -1) -> bytes:
+        return self._f.read(size)
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        return self._f.seek(offset, whence)
+
+    def tell(self) -> int:
+        return self._f.tell()
+
+
+def _retry_delay(attempt: int) -> float:
+    """Exponential backoff (0.5s, 1s, ...) plus up to 250ms of jitter."""
+    return (2 ** attempt) * 0.5 + random.random() * 0.25
+
+
 async def upload_to_immich(
-    file_content: bytes,
+    file_content: Union[bytes, BinaryIO],
     filename: str,
     content_type: str,
     config,  # Config object from main app
     httpx_client: httpx.AsyncClient,  # Shared httpx client
     device_id: str = "immich-drop-url",
     file_created_at: Optional[str] = None,
+    precomputed_sha1: Optional[str] = None,
 ) -> UploadResult:
-    """Upload a file to Immich server"""
-    sha1 = hashlib.sha1(file_content).hexdigest()
-    now = file_created_at or (datetime.utcnow().isoformat() + "Z")
-    device_asset_id = f"{device_id}-{sha1}"
+    """Upload a file to Immich server.
+
+    `file_content` may be raw bytes or an open binary file handle; handles are
+    streamed by httpx in chunks rather than buffered into memory. Pass
+    `precomputed_sha1` when the digest is already known (e.g. from the
+    downloader) to skip re-hashing the body.
+    """
+    now = file_created_at or _utc_now_iso()
 
     try:
-        resp = await httpx_client.post(
-            f"{config.normalized_base_url}/assets",
-            files={"assetData": (filename, file_content, content_type)},
-            data={
-                "deviceAssetId": device_asset_id,
-                "deviceId": device_id,
-                "fileCreatedAt": now,
-                "fileModifiedAt": now,
-                "isFavorite": "false",
-            },
-            headers={
-                "x-api-key": config.immich_api_key,
-                "x-immich-checksum": sha1,
-            },
-            timeout=300.0,
-        )
+        # Hashing reads the whole body; keep that disk/CPU work off the event loop
+        sha1 = precomputed_sha1 or await asyncio.to_thread(_sha1_hex, file_content)
+        if not isinstance(file_content, (bytes, bytearray, memoryview)):
+            file_content = _FileBody(file_content)
+        device_asset_id = f"{device_id}-{sha1}"
+
+        # Retry transient 5xx / connection failures. Safe to repeat: Immich
+        # dedups by x-immich-checksum, so a POST that landed but looked failed
+        # comes back as a duplicate rather than a second asset.
+        for attempt in range(UPLOAD_MAX_ATTEMPTS):
+            if not isinstance(file_content, (bytes, bytearray, memoryview)):
+                file_content.seek(0)
+            try:
+                resp = await httpx_client.post(
+                    f"{config.normalized_base_url}/assets",
+                    files={"assetData": (filename, file_content, content_type)},
+                    data={
+                        "deviceAssetId": device_asset_id,
+                        "deviceId": device_id,
+                        "fileCreatedAt": now,
+                        "fileModifiedAt": now,
+                        "isFavorite": "false",
+                    },
+                    headers={
+                        "x-api-key": config.immich_api_key,
+                        "x-immich-checksum": sha1,
+                    },
+                    timeout=UPLOAD_TIMEOUT,
+                )
+            except httpx.TransportError as e:
+                if attempt == UPLOAD_MAX_ATTEMPTS - 1:
+                    raise
+                logger.warning("Immich upload of %s failed (%s), retrying", filename, e)
+            else:
+                if resp.status_code < 500 or attempt == UPLOAD_MAX_ATTEMPTS - 1:
+                    break
+                logger.warning("Immich returned %s for %s, retrying", resp.status_code, filename)
+            await asyncio.sleep(_retry_delay(attempt))
 
         if resp.status_code in (200, 201):
-            result = resp.json()
-            return UploadResult(
+            result = from_json(resp.content)
+            return UploadResult.model_construct(
                 filename=filename,
                 status="success",
                 asset_id=result.get("id"),
                 duplicate=result.get("duplicate", False),
             )
         else:
-            return UploadResult(
+            return UploadResult.model_construct(
                 filename=filename,
                 status="error",
                 error=f"Immich returned {resp.status_code}: {resp.text[:200]}",
             )
     except Exception as e:
-        return UploadResult(
+        return UploadResult.model_construct(
             filename=filename,
             status="error",
             error=str(e),
         )
 
 
-async def add_asset_to_album(
-    asset_id: str,
+# Album name -> (album_id, resolved_at). Entries expire after a short TTL so an
+# album renamed or deleted in Immich is re-resolved rather than used forever.
+ALBUM_CACHE_TTL_SECONDS = 60.0
+_album_id_cache: dict[str, tuple[str, float]] = {}
+# Serializes cache misses so concurrent batch items don't each list/create
+_album_cache_lock = asyncio.Lock()
+# (etag, name -> id index) from the last GET /albums, revalidated with
+# If-None-Match so an unchanged listing comes back as a bodiless 304
+_album_listing: Optional[tuple[str, dict[str, str]]] = None
+
+
+def clear_album_cache() -> None:
+    """Drop all cached album ids so the next add re-resolves them."""
+    global _album_listing
+    _album_id_cache.clear()
+    _album_listing = None
+
+
+def _cached_album_id(album_name: str) -> Optional[str]:
+    entry = _album_id_cache.get(album_name)
+    if entry and time.monotonic() - entry[1] < ALBUM_CACHE_TTL_SECONDS:
+        return entry[0]
+    return None
+
+
+async def get_album_id(
+    album_name: str,
+    config,
+    httpx_client: httpx.AsyncClient,
+) -> Optional[str]:
+    """Resolve an album name to its id, creating the album if needed (cached)."""
+    album_id = _cached_album_id(album_name)
+    if album_id:
+        return album_id
+
+    global _album_listing
+    async with _album_cache_lock:
+        # Another task may have resolved it while we waited for the lock
+        album_id = _cached_album_id(album_name)
+        if album_id:
+            return album_id
+
+        headers = {"x-api-key": config.immich_api_key}
+
+        # Find or create album
+        list_headers = dict(headers)
+        if _album_listing:
+            list_headers["If-None-Match"] = _album_listing[0]
+        albums_resp = await httpx_client.get(
+            f"{config.normalized_base_url}/albums",
+            headers=list_headers,
+            timeout=30.0,
+        )
+
+        index: Optional[dict[str, str]] = None
+        if albums_resp.status_code == 304 and _album_listing:
+            index = _album_listing[1]
+        elif albums_resp.status_code == 200:
+            # Index every album from this one listing so later lookups for
+            # other names are dict hits too. First match wins on duplicate
+            # names, same as the previous linear scan.
+            index = {}
+            for album in from_json(albums_resp.content):
+                name, aid = album.get("albumName"), album.get("id")
+                if name and aid:
+                    index.setdefault(name, aid)
+            etag = albums_resp.headers.get("etag")
+            _album_listing = (etag, index) if etag else None
+
+        if index is not None:
+            resolved_at = time.monotonic()
+            _album_id_cache.update({name: (aid, resolved_at) for name, aid in index.items()})
+            album_id = index.get(album_name)
+
+        # Create album if not found
+        if not album_id:
+            create_resp = await httpx_client.post(
+                f"{config.normalized_base_url}/albums",
+                headers=headers,
+                json={"albumName": album_name},
+                timeout=30.0,
+            )
+            if create_resp.status_code in (200, 201):
+                album_id = from_json(create_resp.content).get("id")
+
+        if album_id:
+            _album_id_cache[album_name] = (album_id, time.monotonic())
+        return album_id
+
+
+async def add_assets_to_album(
+    asset_ids: List[str],
     album_name: str,
     config,
     httpx_client: httpx.AsyncClient,  # Shared httpx client
 ) -> bool:
-    """Add an asset to an album (creates album if needed)"""
-    headers = {"x-api-key": config.immich_api_key}
-
-    # Find or create album
-    albums_resp = await httpx_client.get(
-        f"{config.normalized_base_url}/albums",
-        headers=headers,
-        timeout=30.0,
-    )
+    """Add assets to an album in one request (creates album if needed)"""
+    if not asset_ids:
+        return False
 
-    album_id = None
-    if albums_resp.status_code == 200:
-        albums = albums_resp.json()
-        for album in albums:
-            if album.get("albumName") == album_name:
-                album_id = album.get("id")
-                break
+    for attempt in range(2):
+        album_id = await get_album_id(album_name, config, httpx_client)
+        if not album_id:
+            return False
 
-    # Create album if not found
-    if not album_id:
-        create_resp = await httpx_client.post(
-            f"{config.normalized_base_url}/albums",
-            headers=headers,
-            json={"albumName": album_name},
+        # Immich takes a list of ids, so a whole batch is a single PUT
+        add_resp = await httpx_client.put(
+            f"{config.normalized_base_url}/albums/{album_id}/assets",
+            headers={"x-api-key": config.immich_api_key},
+            json={"ids": asset_ids},
             timeout=30.0,
         )
-        if create_resp.status_code in (200, 201):
-            album_id = create_resp.json().get("id")
 
-    if not album_id:
-        return False
-
-    # Add asset to album
-    add_resp = await httpx_client.put(
-        f"{config.normalized_base_url}/albums/{album_id}/assets",
-        headers=headers,
-        json={"ids": [asset_id]},
-        timeout=30.0,
-    )
+        if add_resp.status_code != 404:
+            break
+        # Cached album was deleted in Immich; drop it and re-resolve once
+        _album_id_cache.pop(album_name, None)
 
     return add_resp.status_code in (200, 201)
 
 
+async def add_assets_to_album_later(
+    asset_ids: List[str],
+    album_name: str,
+    config,
+    httpx_client: httpx.AsyncClient,  # Shared httpx client
+) -> None:
+    """BackgroundTasks entry point: place assets in an album after the upload
+    response has been sent. Failures are logged, not raised, since the client
+    already has its answer."""
+    if not asset_ids:
+        return
+    try:
+        if not await add_assets_to_album(asset_ids, album_name, config, httpx_client):
+            logger.warning("Could not add %d asset(s) to album %r", len(asset_ids), album_name)
+    except Exception as e:
+        logger.warning("Adding %d asset(s) to album %r failed: %s", len(asset_ids), album_name, e)
+
+
+async def find_existing_assets(
+    checksums: dict[str, str],
+    config,
+    httpx_client: httpx.AsyncClient,
+) -> dict[str, Optional[str]]:
+    """Ask Immich which checksums it already has, in one bulk-upload-check.
+
+    `checksums` maps a caller-chosen id to a SHA-1 hex digest. Returns
+    {id: existing_asset_id} for the duplicates only. Best-effort: any failure
+    returns {} and callers simply upload everything.
+    """
+    if not checksums:
+        return {}
+    try:
+        resp = await httpx_client.post(
+            f"{config.normalized_base_url}/assets/bulk-upload-check",
+            headers={"x-api-key": config.immich_api_key},
+            json={"assets": [{"id": k, "checksum": v} for k, v in checksums.items()]},
+            timeout=30.0,
+        )
+        if resp.status_code != 200:
+            return {}
+        return {
+            x["id"]: x.get("assetId")
+            for x in from_json(resp.content).get("results", [])
+            if x.get("action") == "reject" and x.get("reason") == "duplicate"
+        }
+    except Exception as e:
+        logger.warning("Immich bulk-upload-check failed, uploading all: %s", e)
+        return {}
+
+
+def _album_asset_ids(results: List[UploadResult]) -> List[str]:
+    """Asset ids from a batch that should be added to the target album (deduped)."""
+    return list(dict.fromkeys(r.asset_id for r in results if r.status == "success" and r.asset_id))
+
+
+def _in_batch_repeats(checksums: dict[str, str]) -> dict[str, str]:
+    """Map each item whose checksum already appeared earlier in the batch to
+    the id of that first occurrence, so only the first one is uploaded."""
+    first_seen: dict[str, str] = {}
+    repeats: dict[str, str] = {}
+    for item_id, checksum in checksums.items():
+        if checksum in first_seen:
+            repeats[item_id] = first_seen[checksum]
+        else:
+            first_seen[checksum] = item_id
+    return repeats
+
+
+def _repeat_result(first: UploadResult, filename: str) -> UploadResult:
+    """Result for an in-batch repeat, mirroring the upload of its first occurrence."""
+    if first.status == "success":
+        return first.model_copy(update={"filename": filename, "duplicate": True})
+    return first.model_copy(update={"filename": filename})
+
+
+def _upload_concurrency(config) -> int:
+    """Max simultaneous Immich uploads per batch request (MAX_CONCURRENT, min 1)."""
+    return max(1, getattr(config, "max_concurrent", 1) or 1)
+
+
+async def _bounded_gather(coros, limit: int) -> list:
+    """gather() with at most `limit` coroutines running at once, results in input order."""
+    sem = asyncio.Semaphore(limit)
+
+    async def _run(coro):
+        async with sem:
+            return await coro
+
+    return await asyncio.gather(*(_run(c) for c in coros))
+
+
+def _batch_response(results: List[UploadResult]) -> Response:
+    """Summarize per-item results in a single pass.
+
+    Results are trusted, already-typed models, so the summary is built with
+    `model_construct` and encoded straight to JSON bytes by pydantic-core.
+    `BatchUploadResponse` stays the declared response_model for the OpenAPI
+    schema only.
+    """
+    successful = duplicates = failed = 0
+    for r in results:
+        if r.duplicate:
+            duplicates += 1
+        elif r.status == "success":
+            successful += 1
+        elif r.status == "error":
+            failed += 1
+
+    payload = BatchUploadResponse.model_construct(
+        total=len(results),
+        successful=successful,
+        duplicates=duplicates,
+        failed=failed,
+        results=results,
+    )
+    return Response(content=payload.model_dump_json(), media_type="application/json")
+
+
 # ============================================================================
 # API Endpoints
 # ============================================================================
 
 def create_api_routes(config):
     """Factory function to create routes with config injection"""
+    # Settings are read-only at runtime, so resolve the .env default album once
+    default_album = getattr(config, 'album_name', None)
+
+    async def _upload_download(download_result, source_label: str, httpx_client) -> UploadResult:
+        """Stream one successful download to Immich, labelled with its source."""
+        file_created_at = None
+        if download_result.metadata:
+            timestamp = download_result.metadata.get("timestamp")
+            if timestamp:
+                file_created_at = _timestamp_iso(timestamp)
+
+        f, size = await asyncio.to_thread(_open_for_upload, download_result.filepath)
+        with f:
+            logger.info(
+                "Uploading to Immich: filename=%s content_type=%s size=%d bytes",
+                download_result.filename,
+                download_result.content_type,
+                size,
+            )
+            upload_result = await upload_to_immich(
+                file_content=f,
+                filename=download_result.filename,
+                content_type=download_result.content_type,
+                config=config,
+                httpx_client=httpx_client,
+                device_id=f"immich-drop-{source_label}",
+                file_created_at=file_created_at,
+                precomputed_sha1=download_result.sha1,
+            )
+        upload_result.platform = source_label
+        return upload_result
+
+    # Static for the life of the process: serialize once, serve the bytes
+    supported_platforms_body = SupportedPlatformsResponse(
+        platforms=list(SUPPORTED_PATTERNS.keys()),
+        examples={
+            "tiktok": "https://www.tiktok.com/@user/video/123456",
+            "instagram": "https://www.instagram.com/reel/ABC123/",
+            "reddit": "https://www.reddit.com/r/subreddit/comments/abc123/title",
+            "youtube": "https://www.youtube.com/shorts/ABC123",
+            "twitter": "https://twitter.com/user/status/123456789",
+            "facebook": "https://www.facebook.com/reel/123456789",
+        },
+    ).model_dump_json()
+    supported_platforms_headers = {
+        "Cache-Control": "public, max-age=3600",
+        "ETag": f'"{new_sha1(supported_platforms_body.encode()).hexdigest()}"',
+    }
 
     @router.get("/supported-platforms", response_model=SupportedPlatformsResponse)
-    async def get_supported_platforms():
+    async def get_supported_platforms(request: Request):
         """Advisory list of platforms with dedicated routing/cookie handling.
         Any URL is accepted by /upload/url; this list is examples only."""
-        return SupportedPlatformsResponse(
-            platforms=list(SUPPORTED_PATTERNS.keys()),
-            examples={
-                "tiktok": "https://www.tiktok.com/@user/video/123456",
-                "instagram": "https://www.instagram.com/reel/ABC123/",
-                "reddit": "https://www.reddit.com/r/subreddit/comments/abc123/title",
-                "youtube": "https://www.youtube.com/shorts/ABC123",
-                "twitter": "https://twitter.com/user/status/123456789",
-                "facebook": "https://www.facebook.com/reel/123456789",
-            },
+        if request.headers.get("if-none-match") == supported_platforms_headers["ETag"]:
+            return Response(status_code=304, headers=supported_platforms_headers)
+        return Response(
+            content=supported_platforms_body,
+            media_type="application/json",
+            headers=supported_platforms_headers,
         )
 
     @router.post("/upload/url", response_model=JobResponse)
@@ -281,50 +696,23 @@ def create_api_routes(config):
             update_job(job_id, status="uploading")
 
             source_label = platform or "direct_image"
-            primary_upload_result = None
-            all_upload_results = []
-            total_uploaded = 0
 
             try:
-                for download_result in successful_downloads:
-                    with open(download_result.filepath, "rb") as f:
-                        file_content = f.read()
-
-                    logger.info(
-                        "Uploading to Immich: filename=%s content_type=%s size=%d bytes",
-                        download_result.filename,
-                        download_result.content_type,
-                        len(file_content),
-                    )
+                # Gallery/carousel items are independent POSTs; overlap them,
+                # bounded by MAX_CONCURRENT. Results keep download order, so
+                # the first item is still the primary result.
+                all_upload_results = await _bounded_gather(
+                    (_upload_download(d, source_label, httpx_client) for d in successful_downloads),
+                    _upload_concurrency(config),
+                )
+                primary_upload_result = all_upload_results[0]
+                total_uploaded = sum(1 for r in all_upload_results if r.status == "success")
 
-                    file_created_at = None
-                    if download_result.metadata:
-                        timestamp = download_result.metadata.get("timestamp")
-                        if timestamp:
-                            file_created_at = datetime.fromtimestamp(timestamp).isoformat() + "Z"
-
-                    upload_result = await upload_to_immich(
-                        file_content=file_content,
-                        filename=download_result.filename,
-                        content_type=download_result.content_type,
-                        config=config,
-                        httpx_client=httpx_client,
-                        device_id=f"immich-drop-{source_label}",
-                        file_created_at=file_created_at,
+                target_album = album_name or default_album
+                if target_album:
+                    await add_assets_to_album(
+                        _album_asset_ids(all_upload_results), target_album, config, httpx_client,
                     )
-                    upload_result.platform = source_label
-
-                    target_album = album_name or getattr(config, 'album_name', None)
-                    if target_album and upload_result.asset_id and upload_result.status == "success":
-                        await add_asset_to_album(upload_result.asset_id, target_album, config, httpx_client)
-
-                    if upload_result.status == "success":
-                        total_uploaded += 1
-
-                    all_upload_results.append(upload_result)
-
-                    if primary_upload_result is None:
-                        primary_upload_result = upload_result
 
                 if total_uploaded > 1:
                     logger.info(
@@ -332,7 +720,7 @@ def create_api_routes(config):
                         total_uploaded, len(successful_downloads), url,
                     )
 
-                response = UrlUploadResponse(
+                response = UrlUploadResponse.model_construct(
                     success=primary_upload_result.status == "success",
                     result=primary_upload_result,
                     error=primary_upload_result.error,
@@ -342,8 +730,9 @@ def create_api_routes(config):
                 update_job(job_id, status="completed", result=response.model_dump())
 
             finally:
+                # Unlinking large videos can stall the loop; use a worker thread
                 for download_result in download_results:
-                    cleanup_download(download_result)
+                    await asyncio.to_thread(cleanup_download, download_result)
 
         except Exception as e:
             logger.exception("Job %s failed: %s", job_id, e)
@@ -378,7 +767,7 @@ def create_api_routes(config):
 
         Max 10 URLs per request
         """
-        urls = [u.strip() for u in batch_request.urls if u.strip()]
+        urls = [u for u in (raw.strip() for raw in batch_request.urls) if u]
         httpx_client = request.app.state.httpx_client
 
         if not urls:
@@ -390,77 +779,142 @@ def create_api_routes(config):
         # Collect platforms for cookie selection; unknown URLs are allowed through
         # and attempted by yt-dlp / gallery-dl.
         platforms = [identify_platform(u) for u in urls]
+        platform_by_url = dict(zip(urls, platforms))
 
-        # Look up cookies - if all URLs are from the same platform, use cookies
-        cookies_file = None
+        # Look up cookies once per platform so mixed batches get them too.
+        # Unrecognized URLs borrow the cookies only when the batch is
+        # otherwise single-platform (e.g. a short link to the same site).
         unique_platforms = set(p for p in platforms if p is not None)
-        if len(unique_platforms) == 1:
-            cookies_file = get_cookie_file_for_platform(list(unique_platforms)[0], config.state_db)
-
-        results = []
-        download_results = await download_multiple_urls(urls, cookies_file=cookies_file, settings=config)
-
-        for download_result in download_results:
-            # Derive platform from the result's metadata or original URL
-            post_url = (download_result.metadata or {}).get("post_url", "")
-            platform = identify_platform(post_url) if post_url else None
-            source_label = platform or (download_result.metadata or {}).get("source", "direct_image")
-
-            if not download_result.success:
-                results.append(UploadResult(
-                    filename=download_result.filename or post_url or "unknown",
-                    status="error",
-                    error=download_result.error,
-                    platform=source_label,
-                ))
-                continue
-
-            try:
-                with open(download_result.filepath, "rb") as f:
-                    file_content = f.read()
-
-                file_created_at = None
-                if download_result.metadata:
-                    timestamp = download_result.metadata.get("timestamp")
-                    if timestamp:
-                        file_created_at = datetime.fromtimestamp(timestamp).isoformat() + "Z"
-
-                upload_result = await upload_to_immich(
-                    file_content=file_content,
-                    filename=download_result.filename,
-                    content_type=download_result.content_type,
-                    config=config,
-                    httpx_client=httpx_client,
-                    device_id=f"immich-drop-{source_label}",
-                    file_created_at=file_created_at,
-                )
-                upload_result.platform = source_label
-
-                # Add to album
-                album_name = batch_request.album_name or getattr(config, 'album_name', None)
-                if album_name and upload_result.asset_id and upload_result.status == "success":
-                    await add_asset_to_album(upload_result.asset_id, album_name, config, httpx_client)
+        cookies_by_platform = {
+            p: get_cookie_file_for_platform(p, config.state_db) for p in unique_platforms
+        }
+        fallback_cookies = (
+            next(iter(cookies_by_platform.values())) if len(cookies_by_platform) == 1 else None
+        )
+        cookies_files = [cookies_by_platform.get(p, fallback_cookies) for p in platforms]
+
+        upload_sem = asyncio.Semaphore(_upload_concurrency(config))
+        # sha1 -> result of the first upload of that content in this batch, so
+        # the same media linked twice is uploaded once and repeats copy it
+        first_uploads: dict[str, asyncio.Future] = {}
+
+        async def _upload_url(download_results) -> List[UploadResult]:
+            """Hash, bulk-check and upload one URL's downloads. Runs as soon as
+            that URL finishes, while slower URLs are still downloading."""
+            # upload_to_immich reuses these digests via precomputed_sha1
+            to_hash = [d for d in download_results if d.success and not d.sha1]
+            digests = await asyncio.gather(
+                *(asyncio.to_thread(_sha1_file, d.filepath) for d in to_hash), return_exceptions=True,
+            )
+            for download_result, digest in zip(to_hash, digests):
+                if isinstance(digest, Exception):
+                    # Unreadable download: report it for this item, don't fail the batch
+                    logger.warning("Could not hash %s: %s", download_result.filepath, digest)
+                    download_result.success = False
+                    download_result.error = f"Could not read downloaded file: {digest}"
+                    background_tasks.add_task(cleanup_download, download_result)
+                else:
+                    download_result.sha1 = digest
+
+            # Claim content not yet seen in this batch; no await between the
+            # membership test and the claim, so each checksum has one owner.
+            owned: dict[str, str] = {}
+            for i, d in enumerate(download_results):
+                if d.success and d.sha1 not in first_uploads:
+                    first_uploads[d.sha1] = asyncio.get_running_loop().create_future()
+                    owned[str(i)] = d.sha1
+            existing = await find_existing_assets(owned, config, httpx_client)
+
+            async def _process(index: int, download_result) -> UploadResult:
+                # Derive platform from the result's metadata or original URL
+                post_url = (download_result.metadata or {}).get("post_url", "")
+                if post_url in platform_by_url:
+                    platform = platform_by_url[post_url]
+                else:
+                    # Redirect-resolved URL (e.g. Reddit share link); match it fresh
+                    platform = identify_platform(post_url) if post_url else None
+                source_label = platform or (download_result.metadata or {}).get("source", "direct_image")
+
+                if not download_result.success:
+                    return UploadResult.model_construct(
+                        filename=download_result.filename or post_url or "unknown",
+                        status="error",
+                        error=download_result.error,
+                        platform=source_label,
+                    )
 
-                results.append(upload_result)
+                first_upload = first_uploads[download_result.sha1]
+                try:
+                    if str(index) not in owned:
+                        return _repeat_result(await first_upload, download_result.filename)
+
+                    if str(index) in existing:
+                        result = UploadResult.model_construct(
+                            filename=download_result.filename,
+                            status="success",
+                            asset_id=existing[str(index)],
+                            duplicate=True,
+                            platform=source_label,
+                        )
+                    else:
+                        async with upload_sem:
+                            result = await _upload_download(download_result, source_label, httpx_client)
+                    first_upload.set_result(result)
+                    return result
+
+                finally:
+                    if str(index) in owned and not first_upload.done():
+                        # Upload raised; don't leave repeats waiting forever
+                        first_upload.set_result(UploadResult.model_construct(
+                            filename=download_result.filename,
+                            status="error",
+                            error="Upload failed",
+                            platform=source_label,
+                        ))
+                    background_tasks.add_task(cleanup_download, download_result)
+
+            return await asyncio.gather(*(_process(i, d) for i, d in enumerate(download_results)))
+
+        # Start each URL's uploads the moment its download completes instead
+        # of waiting for the slowest URL in the batch.
+        uploads: List[Optional[asyncio.Task]] = [None] * len(urls)
+        downloaded = []
+        downloads = iter_multiple_urls(urls, settings=config, cookies_files=cookies_files)
+        try:
+            async for index, download_results in downloads:
+                downloaded.extend(download_results)
+                uploads[index] = asyncio.create_task(_upload_url(download_results))
+            # Results keep URL order so they line up with the request
+            results = [r for per_url in await asyncio.gather(*uploads) for r in per_url]
+        except BaseException:
+            # Iteration failed or the request was cancelled. No response means
+            # no background cleanup, so stop the pending downloads and started
+            # uploads and remove their temp files here.
+            await downloads.aclose()
+            pending = [t for t in uploads if t is not None]
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            for download_result in downloaded:
+                try:
+                    cleanup_download(download_result)
+                except OSError:
+                    pass
+            raise
+
+        # Add to album after responding: one PUT for the whole batch
+        album_name = batch_request.album_name or default_album
+        if album_name:
+            background_tasks.add_task(
+                add_assets_to_album_later, _album_asset_ids(results), album_name, config, httpx_client,
+            )
 
-            finally:
-                background_tasks.add_task(cleanup_download, download_result)
-
-        successful = sum(1 for r in results if r.status == "success" and not r.duplicate)
-        duplicates = sum(1 for r in results if r.duplicate)
-        failed = sum(1 for r in results if r.status == "error")
-
-        return BatchUploadResponse(
-            total=len(results),
-            successful=successful,
-            duplicates=duplicates,
-            failed=failed,
-            results=results,
-        )
+        return _batch_response(results)
 
     @router.post("/upload/batch", response_model=BatchUploadResponse)
     async def upload_batch_files(
         request: Request,
+        background_tasks: BackgroundTasks,
         files: List[UploadFile] = File(...),
         album_name: Optional[str] = Form(None),
     ):
@@ -477,44 +931,67 @@ def create_api_routes(config):
         if len(files) > 50:
             raise HTTPException(status_code=400, detail="Maximum 50 files per request")
 
-        results = []
+        # One timestamp for the whole batch rather than one per file
+        now_iso = _utc_now_iso()
+
+        # Skip uploading files Immich already has (one bulk-check call)
+        checksums = await asyncio.gather(*(asyncio.to_thread(_sha1_hex, f.file) for f in files))
+        by_index = {str(i): c for i, c in enumerate(checksums)}
+        # The same photo attached twice is uploaded once; repeats copy its result
+        repeats = _in_batch_repeats(by_index)
+        existing = await find_existing_assets(
+            {k: v for k, v in by_index.items() if k not in repeats}, config, httpx_client,
+        )
+
+        async def _process(index: int, file: UploadFile) -> Optional[UploadResult]:
+            filename = file.filename or _fallback_filename()
+            if str(index) in repeats:
+                return None  # filled in from the first occurrence below
+            if str(index) in existing:
+                return UploadResult.model_construct(
+                    filename=filename,
+                    status="success",
+                    asset_id=existing[str(index)],
+                    duplicate=True,
+                )
 
-        for file in files:
-            contents = await file.read()
-            filename = file.filename or f"upload_{datetime.utcnow().timestamp()}"
             content_type = file.content_type or "application/octet-stream"
 
-            upload_result = await upload_to_immich(
-                file_content=contents,
+            # Stream from Starlette's spooled temp file instead of
+            # buffering the whole upload in memory (upload_to_immich hides
+            # fileno() so small uploads stay in memory).
+            return await upload_to_immich(
+                file_content=file.file,
                 filename=filename,
                 content_type=content_type,
                 config=config,
                 httpx_client=httpx_client,
                 device_id="ios-shortcut",
+                file_created_at=now_iso,
+                precomputed_sha1=checksums[index],
             )
 
-            # Add to album
-            target_album = album_name or getattr(config, 'album_name', None)
-            if target_album and upload_result.asset_id and upload_result.status == "success":
-                await add_asset_to_album(upload_result.asset_id, target_album, config, httpx_client)
-
-            results.append(upload_result)
-
-        successful = sum(1 for r in results if r.status == "success" and not r.duplicate)
-        duplicates = sum(1 for r in results if r.duplicate)
-        failed = sum(1 for r in results if r.status == "error")
-
-        return BatchUploadResponse(
-            total=len(results),
-            successful=successful,
-            duplicates=duplicates,
-            failed=failed,
-            results=results,
+        results = await _bounded_gather(
+            (_process(i, f) for i, f in enumerate(files)),
+            _upload_concurrency(config),
         )
+        for index, first in repeats.items():
+            i = int(index)
+            results[i] = _repeat_result(results[int(first)], files[i].filename or _fallback_filename())
+
+        # Add to album after responding: one PUT for the whole batch
+        target_album = album_name or default_album
+        if target_album:
+            background_tasks.add_task(
+                add_assets_to_album_later, _album_asset_ids(results), target_album, config, httpx_client,
+            )
+
+        return _batch_response(results)
 
     @router.post("/upload/file", response_model=UploadResult)
     async def upload_single_file(
         request: Request,
+        background_tasks: BackgroundTasks,
         file: UploadFile = File(...),
         album_name: Optional[str] = Form(None),
     ):
@@ -522,12 +999,11 @@ def create_api_routes(config):
         Upload a single file - simpler endpoint for iOS Shortcuts
         """
         httpx_client = request.app.state.httpx_client
-        contents = await file.read()
-        filename = file.filename or f"upload_{datetime.utcnow().timestamp()}"
+        filename = file.filename or _fallback_filename()
         content_type = file.content_type or "application/octet-stream"
 
         upload_result = await upload_to_immich(
-            file_content=contents,
+            file_content=file.file,
             filename=filename,
             content_type=content_type,
             config=config,
@@ -535,15 +1011,18 @@ def create_api_routes(config):
             device_id="ios-shortcut",
         )
 
-        target_album = album_name or getattr(config, 'album_name', None)
+        target_album = album_name or default_album
         if target_album and upload_result.asset_id and upload_result.status == "success":
-            await add_asset_to_album(upload_result.asset_id, target_album, config, httpx_client)
+            background_tasks.add_task(
+                add_assets_to_album_later, [upload_result.asset_id], target_album, config, httpx_client,
+            )
 
         return upload_result
 
     @router.post("/upload/base64", response_model=UploadResult)
     async def upload_base64_file(
         request: Request,
+        background_tasks: BackgroundTasks,
         upload_request: Base64UploadRequest,
     ):
         """
@@ -562,46 +1041,53 @@ def create_api_routes(config):
         try:
             # Handle data URL format (e.g., "data:image/jpeg;base64,/9j/4AAQ...")
             data_str = upload_request.data
+            start = 0
             if data_str.startswith("data:"):
-                # Extract the base64 part after the comma
-                header, data_str = data_str.split(",", 1)
+                # Decode from just past the comma instead of copying the tail
+                start = data_str.index(",") + 1
 
-            file_content = base64.b64decode(data_str)
+            file_obj, sha1, (detected_ext, detected_mime) = await asyncio.to_thread(
+                _decode_base64, data_str, start,
+            )
         except Exception as e:
             raise HTTPException(status_code=400, detail=f"Invalid base64 data: {str(e)}")
 
-        # Detect file type from magic bytes
-        detected_ext, detected_mime = detect_file_type(file_content)
-
-        # Determine filename - use provided name or generate one
-        base_filename = upload_request.filename or f"upload_{datetime.utcnow().timestamp()}"
-
-        # If filename lacks extension or has wrong extension, use detected type
-        _, existing_ext = os.path.splitext(base_filename)
-        if detected_ext and (not existing_ext or existing_ext.lower() not in ['.jpg', '.jpeg', '.png', '.gif', '.webp', '.heic', '.avif', '.mp4', '.mov', '.bmp', '.tiff']):
-            filename = base_filename + detected_ext
-        else:
-            filename = base_filename if existing_ext else base_filename + (detected_ext or '.jpg')
-
-        # Use detected MIME type or fall back to guessing from filename
-        if detected_mime:
-            content_type = detected_mime
-        else:
-            content_type, _ = mimetypes.guess_type(filename)
-            content_type = content_type or "application/octet-stream"
-
-        upload_result = await upload_to_immich(
-            file_content=file_content,
-            filename=filename,
-            content_type=content_type,
-            config=config,
-            httpx_client=httpx_client,
-            device_id="ios-shortcut-base64",
-        )
+        try:
+            # Determine filename - use provided name or generate one
+            base_filename = upload_request.filename or _fallback_filename()
+
+            # If filename lacks extension or has wrong extension, use detected type
+            _, existing_ext = os.path.splitext(base_filename)
+            if detected_ext and (not existing_ext or existing_ext.lower() not in _KNOWN_MEDIA_EXTENSIONS):
+                filename = base_filename + detected_ext
+            else:
+                filename = base_filename if existing_ext else base_filename + (detected_ext or '.jpg')
+
+            # Use detected MIME type or fall back to guessing from filename
+            if detected_mime:
+                content_type = detected_mime
+            else:
+                content_type, _ = mimetypes.guess_type(filename)
+                content_type = content_type or "application/octet-stream"
+
+            # Stream the decoded temp file rather than holding it in memory
+            upload_result = await upload_to_immich(
+                file_content=file_obj,
+                filename=filename,
+                content_type=content_type,
+                config=config,
+                httpx_client=httpx_client,
+                device_id="ios-shortcut-base64",
+                precomputed_sha1=sha1,
+            )
+        finally:
+            file_obj.close()
 
-        target_album = upload_request.album_name or getattr(config, 'album_name', None)
+        target_album = upload_request.album_name or default_album
         if target_album and upload_result.asset_id and upload_result.status == "success":
-            await add_asset_to_album(upload_result.asset_id, target_album, config, httpx_client)
+            background_tasks.add_task(
+                add_assets_to_album_later, [upload_result.asset_id], target_album, config, httpx_client,
+            )
 
         return upload_result
 
@@ -16,15 +16,19 @@ import json
 import hashlib
 import os
 import re
+import shutil
 import sqlite3
+import struct
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import asynccontextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import BinaryIO, Dict, Iterable, List, Optional, Set, Tuple, Union
 
 import httpx
-import requests
-from requests_toolbelt.multipart.encoder import MultipartEncoder, MultipartEncoderMonitor
 import logging
 from fastapi import FastAPI, HTTPException, UploadFile, WebSocket, WebSocketDisconnect, Request, Form
 from fastapi.responses import HTMLResponse, JSONResponse, FileResponse, RedirectResponse, Response
@@ -47,8 +51,18 @@ from version import VERSION
 async def lifespan(app: FastAPI):
     """Manage application lifecycle - initialize and cleanup shared resources."""
     logger.info(f"Starting immich-drop v{VERSION}")
-    # Startup: create shared httpx client for connection pooling
-    app.state.httpx_client = httpx.AsyncClient(timeout=30.0)
+    # Startup: create one shared httpx client for connection pooling. HTTP/2 is
+    # negotiated via ALPN when Immich sits behind TLS so concurrent uploads
+    # multiplex over a single connection; plain-HTTP setups fall back to 1.1.
+    app.state.httpx_client = httpx.AsyncClient(
+        http2=True,
+        timeout=httpx.Timeout(30.0, connect=10.0, pool=None),
+        limits=httpx.Limits(
+            max_connections=100,
+            max_keepalive_connections=50,
+            keepalive_expiry=30.0,
+        ),
+    )
     yield
     # Shutdown: close the shared client
     await app.state.httpx_client.aclose()
@@ -78,7 +92,8 @@ FRONTEND_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "fronten
 app.mount("/static", StaticFiles(directory=FRONTEND_DIR), name="static")
 
 # Include URL/batch upload routes
-from .api_routes import create_api_routes
+from .api_routes import create_api_routes, clear_album_cache, UPLOAD_TIMEOUT
+from .utils import new_sha1
 api_router = create_api_routes(SETTINGS)
 app.include_router(api_router)
 
@@ -90,22 +105,45 @@ except Exception:
     pass
 _CHUNK_ROOT_RESOLVED = Path(CHUNK_ROOT).resolve()
 
-# Album cache
-ALBUM_ID: Optional[str] = None
+# Album cache: (Immich credential, album name) -> album id, for the default
+# album and invite albums. Keyed by credential since sessions see different albums.
+_album_ids: Dict[Tuple[str, str], str] = {}
 # Lock to prevent concurrent album creation race conditions
 _album_lock = asyncio.Lock()
 
 def reset_album_cache() -> None:
-    """Invalidate the cached Immich album id so next use re-resolves it."""
-    global ALBUM_ID
-    ALBUM_ID = None
+    """Invalidate the cached Immich album ids so next use re-resolves them."""
+    _album_ids.clear()
+    clear_album_cache()
 
 # ---------- DB (local dedupe cache) ----------
 
+_db_local = threading.local()
+
+def db_conn() -> sqlite3.Connection:
+    """Reusable connection to the state DB for the calling thread.
+
+    Opening a connection per query costs several syscalls and a cold page
+    cache on every upload; instead each worker thread keeps one open. WAL (set once in db_init) lets readers run
+    alongside the single writer; synchronous=NORMAL is durable under WAL.
+    """
+    conn = getattr(_db_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(SETTINGS.state_db, timeout=30.0, cached_statements=256)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        _db_local.conn = conn
+    return conn
+
 def db_init() -> None:
-    """Create the local SQLite table used for duplicate checks (idempotent)."""
+    """Create the local SQLite tables for duplicate checks and upload events (idempotent)."""
     conn = sqlite3.connect(SETTINGS.state_db)
     cur = conn.cursor()
+    # Persistent per database file; best-effort on filesystems without WAL support
+    try:
+        cur.execute("PRAGMA journal_mode=WAL")
+    except sqlite3.DatabaseError:
+        pass
     cur.execute(
         """
         CREATE TABLE IF NOT EXISTS uploads (
@@ -120,39 +158,172 @@ def db_init() -> None:
         );
         """
     )
+    # db_lookup_device_asset probes this column on every upload. Not UNIQUE:
+    # existing databases may already hold repeated deviceAssetIds.
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_uploads_device_asset_id ON uploads(device_asset_id)")
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS upload_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            token TEXT,
+            uploaded_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            ip TEXT,
+            user_agent TEXT,
+            fingerprint TEXT,
+            filename TEXT,
+            size INTEGER,
+            checksum TEXT,
+            immich_asset_id TEXT
+        );
+        """
+    )
+    # Per-invite upload listings and invite deletes filter on token
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_upload_events_token ON upload_events(token)")
     conn.commit()
     conn.close()
 
 def db_lookup_checksum(checksum: str) -> Optional[dict]:
     """Return a record for the given checksum if seen before (None if not)."""
-    conn = sqlite3.connect(SETTINGS.state_db)
-    cur = conn.cursor()
-    cur.execute("SELECT checksum, immich_asset_id FROM uploads WHERE checksum = ?", (checksum,))
-    row = cur.fetchone()
-    conn.close()
+    row = db_conn().execute("SELECT checksum, immich_asset_id FROM uploads WHERE checksum = ?", (checksum,)).fetchone()
     if row:
         return {"checksum": row[0], "immich_asset_id": row[1]}
     return None
 
 def db_lookup_device_asset(device_asset_id: str) -> bool:
     """True if a deviceAssetId has been uploaded by this service previously."""
-    conn = sqlite3.connect(SETTINGS.state_db)
-    cur = conn.cursor()
-    cur.execute("SELECT 1 FROM uploads WHERE device_asset_id = ?", (device_asset_id,))
-    row = cur.fetchone()
-    conn.close()
+    row = db_conn().execute("SELECT 1 FROM uploads WHERE device_asset_id = ?", (device_asset_id,)).fetchone()
     return bool(row)
 
 def db_insert_upload(checksum: str, filename: str, size: int, device_asset_id: str, immich_asset_id: Optional[str], created_at: str) -> None:
     """Insert a newly-uploaded asset into the local cache (ignore on duplicates)."""
-    conn = sqlite3.connect(SETTINGS.state_db)
-    cur = conn.cursor()
-    cur.execute(
-        "INSERT OR IGNORE INTO uploads (checksum, filename, size, device_asset_id, immich_asset_id, created_at) VALUES (?,?,?,?,?,?)",
-        (checksum, filename, size, device_asset_id, immich_asset_id, created_at)
-    )
-    conn.commit()
-    conn.close()
+    conn = db_conn()
+    with conn:
+        conn.execute(
+            "INSERT OR IGNORE INTO uploads (checksum, filename, size, device_asset_id, immich_asset_id, created_at) VALUES (?,?,?,?,?,?)",
+            (checksum, filename, size, device_asset_id, immich_asset_id, created_at)
+        )
+
+# Built once so every lookup hits the connection's statement cache with the same text
+_INVITE_LOOKUP_SQL = (
+    "SELECT token, album_id, album_name, max_uses, used_count, expires_at, COALESCE(claimed,0), "
+    "claimed_by_session, password_hash, COALESCE(disabled,0) FROM invites WHERE token = ?"
+)
+
+def db_get_invite(token: str) -> Optional[tuple]:
+    """Return the invite row used for upload gating (None if unknown)."""
+    return db_conn().execute(_INVITE_LOOKUP_SQL, (token,)).fetchone()
+
+def db_claim_invite(token: str, session_id: str) -> Optional[str]:
+    """Atomically claim a one-time invite for a session; returns the owning session.
+
+    One statement claims an unclaimed invite or confirms this session's own
+    claim. None means another session holds it or the invite is gone.
+    """
+    conn = db_conn()
+    with conn:
+        row = conn.execute(
+            "UPDATE invites SET claimed = 1,"
+            " claimed_at = COALESCE(claimed_at, CURRENT_TIMESTAMP), claimed_by_session = ?"
+            " WHERE token = ? AND (COALESCE(claimed,0) = 0 OR claimed_by_session = ?) RETURNING claimed_by_session",
+            (session_id, token, session_id)
+        ).fetchone()
+    return row[0] if row else None
+
+def db_reserve_invite_use(token: str) -> bool:
+    """Count one use against a multi-use invite if it has uses left.
+
+    Check and increment are one UPDATE, so concurrent uploads cannot overrun
+    `max_uses`. Returns False when the invite is missing or used up.
+    """
+    conn = db_conn()
+    with conn:
+        return conn.execute(
+            "UPDATE invites SET used_count = COALESCE(used_count,0) + 1"
+            " WHERE token = ? AND (max_uses IS NULL OR max_uses < 0 OR COALESCE(used_count,0) < max_uses)",
+            (token,)
+        ).rowcount > 0
+
+def db_release_invite_use(token: str) -> None:
+    """Give back a use reserved by db_reserve_invite_use (upload failed)."""
+    conn = db_conn()
+    with conn:
+        conn.execute("UPDATE invites SET used_count = MAX(COALESCE(used_count,0) - 1, 0) WHERE token = ?", (token,))
+
+def db_record_upload(checksum: str, filename: str, size: int, device_asset_id: str, immich_asset_id: Optional[str], created_at: str,
+                     invite_token: Optional[str], ip: Optional[str], user_agent: str, fingerprint: str) -> None:
+    """Persist a successful upload in one transaction (one commit, one WAL sync).
+
+    Writes the local duplicate-cache row, marks a one-time invite as used
+    (multi-use invites were counted by db_reserve_invite_use before the
+    upload) and logs the uploader identity to upload_events.
+    """
+    conn = db_conn()
+    with conn:
+        conn.execute(
+            "INSERT OR IGNORE INTO uploads (checksum, filename, size, device_asset_id, immich_asset_id, created_at) VALUES (?,?,?,?,?,?)",
+            (checksum, filename, size, device_asset_id, immich_asset_id, created_at)
+        )
+        if invite_token:
+            conn.execute("UPDATE invites SET used_count = 1 WHERE token = ? AND max_uses = 1", (invite_token,))
+        conn.execute(
+            "INSERT INTO upload_events (token, ip, user_agent, fingerprint, filename, size, checksum, immich_asset_id) VALUES (?,?,?,?,?,?,?,?)",
+            (invite_token or '', ip, user_agent, fingerprint, filename, size, checksum, immich_asset_id)
+        )
+
+# All writes go through one thread so they queue in-process rather than
+# contending for SQLite's write lock; reads use the default to_thread pool.
+_db_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite-writer")
+
+async def db_write(fn, *args):
+    """Run a sync DB write on the dedicated writer thread."""
+    return await asyncio.get_running_loop().run_in_executor(_db_writer, fn, *args)
+
+# Invite rows are read before every file of a drag-and-drop batch; keep them
+# briefly in memory. Entries are dropped whenever admin settings change. The
+# cached used_count/claimed are not used for gating: one-time claims go through
+# db_claim_invite and multi-use uploads reserve a use with db_reserve_invite_use.
+INVITE_CACHE_TTL = 30.0
+_invite_cache: Dict[str, tuple] = {}
+_invite_cache_lock = asyncio.Lock()
+# Bumped on invalidation so a read that raced a write is not cached
+_invite_cache_gen: Dict[str, int] = {}
+_invite_cache_epoch = 0
+
+async def get_invite(token: str) -> Optional[tuple]:
+    """Invite row for upload gating, served from a short TTL cache."""
+    hit = _invite_cache.get(token)
+    if hit and hit[0] > time.monotonic():
+        return hit[1]
+    async with _invite_cache_lock:
+        hit = _invite_cache.get(token)
+        if hit and hit[0] > time.monotonic():
+            return hit[1]
+        gen = (_invite_cache_epoch, _invite_cache_gen.get(token, 0))
+        row = await asyncio.to_thread(db_get_invite, token)
+        if row and gen == (_invite_cache_epoch, _invite_cache_gen.get(token, 0)):
+            _invite_cache[token] = (time.monotonic() + INVITE_CACHE_TTL, row)
+        return row
+
+async def reserve_invite_use(token: str) -> bool:
+    """Reserve one use of a multi-use invite before uploading to Immich."""
+    return await db_write(db_reserve_invite_use, token)
+
+async def release_invite_use(token: str) -> None:
+    """Hand back a reserved invite use after a failed upload (best effort)."""
+    try:
+        await db_write(db_release_invite_use, token)
+    except Exception as e:
+        logger.exception("Failed to release invite use: %s", e)
+
+def invalidate_invite_cache(*tokens: str) -> None:
+    """Drop cached invite rows (all of them when no token is given)."""
+    global _invite_cache_epoch
+    if not tokens:
+        _invite_cache_epoch += 1
+        _invite_cache.clear()
+    for token in tokens:
+        _invite_cache_gen[token] = _invite_cache_gen.get(token, 0) + 1
+        _invite_cache.pop(token, None)
 
 db_init()
 
@@ -161,38 +332,42 @@ db_init()
 class SessionHub:
     """Holds WebSocket connections per session and broadcasts progress updates."""
     def __init__(self) -> None:
-        self.sessions: Dict[str, List[WebSocket]] = {}
+        self.sessions: Dict[str, Set[WebSocket]] = {}
 
     async def connect(self, session_id: str, ws: WebSocket) -> None:
         """Register a newly accepted WebSocket under the given session id."""
-        self.sessions.setdefault(session_id, []).append(ws)
+        self.sessions.setdefault(session_id, set()).add(ws)
 
-    def _cleanup_closed(self, session_id: str) -> None:
-        """Drop closed sockets and cleanup empty session buckets."""
-        if session_id not in self.sessions:
+    def _discard(self, session_id: str, sockets: Iterable[WebSocket]) -> None:
+        """Drop sockets from a session and delete the bucket once it is empty."""
+        conns = self.sessions.get(session_id)
+        if conns is None:
             return
-        self.sessions[session_id] = [w for w in self.sessions[session_id] if w.client_state == WebSocketState.CONNECTED]
-        if not self.sessions[session_id]:
+        conns.difference_update(sockets)
+        if not conns:
             del self.sessions[session_id]
 
     async def send(self, session_id: str, payload: dict) -> None:
         """Broadcast a JSON payload to all sockets for one session."""
-        conns = self.sessions.get(session_id, [])
-        for ws in list(conns):
-            try:
-                await ws.send_text(json.dumps(payload))
-            except Exception:
+        conns = self.sessions.get(session_id)
+        if not conns:
+            return
+        conns = tuple(conns)
+        # Encode once; write to every tab's socket concurrently
+        text = json.dumps(payload, separators=(",", ":"))
+        results = await asyncio.gather(*(ws.send_text(text) for ws in conns), return_exceptions=True)
+        failed = [ws for ws, result in zip(conns, results) if isinstance(result, Exception)]
+        if failed:
+            for ws in failed:
                 try:
                     await ws.close()
                 except Exception:
                     pass
-        self._cleanup_closed(session_id)
+            self._discard(session_id, failed)
 
     async def disconnect(self, session_id: str, ws: WebSocket) -> None:
         """Remove a socket from the hub and close it (best-effort)."""
-        if session_id in self.sessions and ws in self.sessions[session_id]:
-            self.sessions[session_id].remove(ws)
-            self._cleanup_closed(session_id)
+        self._discard(session_id, (ws,))
         # Only try to close if the connection is still open
         if ws.client_state == WebSocketState.CONNECTED:
             try:
@@ -204,11 +379,17 @@ hub = SessionHub()
 
 # ---------- Helpers ----------
 
-def sha1_hex(file_bytes: bytes) -> str:
-    """Return SHA-1 hex digest of file_bytes."""
-    h = hashlib.sha1()
-    h.update(file_bytes)
-    return h.hexdigest()
+def sha1_file_hex(fileobj: BinaryIO) -> tuple[str, int]:
+    """Return (SHA-1 hex digest, size) of a seekable file, rewound afterwards.
+
+    hashlib.file_digest hashes in C with the GIL released (OpenSSL picks the
+    SHA-NI / ARMv8 path where available). Blocking: run via asyncio.to_thread.
+    """
+    fileobj.seek(0)
+    digest = hashlib.file_digest(fileobj, new_sha1).hexdigest()
+    size = fileobj.tell()
+    fileobj.seek(0)
+    return digest, size
 
 _ID_RE = re.compile(r"^[0-9a-fA-F][0-9a-fA-F\-]{0,63}$")
 
@@ -226,6 +407,9 @@ def _validate_id(value: Optional[str]) -> str:
     return v
 
 
+# Control characters dropped, path separators mapped to '_' (one C-level pass)
+_FILENAME_TRANSLATION = {**dict.fromkeys(range(32)), 127: None, ord('/'): '_', ord('\\'): '_'}
+
 def sanitize_filename(name: Optional[str]) -> str:
     """Return a minimally sanitized filename that preserves the original name.
 
@@ -236,47 +420,135 @@ def sanitize_filename(name: Optional[str]) -> str:
     """
     if not name:
         return "file"
-    cleaned_chars = []
-    for ch in str(name):
-        o = ord(ch)
-        if o < 32 or o == 127:
-            continue
-        if ch in ('/', '\\'):
-            cleaned_chars.append('_')
-        else:
-            cleaned_chars.append(ch)
-    cleaned = ''.join(cleaned_chars).strip()
+    cleaned = str(name).translate(_FILENAME_TRANSLATION).strip()
     return cleaned or "file"
 
-def read_exif_datetimes(file_bytes: bytes):
+# JPEG Exif lives in an APP1 segment (<= 64 KiB) ahead of the image data
+EXIF_SCAN_BYTES = 256 * 1024
+
+def _tiff_datetime_original(tiff: bytes) -> Optional[str]:
+    """DateTimeOriginal (0x9003) from a TIFF-structured Exif block, or None.
+
+    Like PIL's merged EXIF dict, the Exif sub-IFD wins over IFD0.
+    Raises struct.error/ValueError on malformed data.
+    """
+    if tiff[:2] == b"II":
+        bo = "<"
+    elif tiff[:2] == b"MM":
+        bo = ">"
+    else:
+        raise ValueError("bad TIFF byte order")
+
+    def find(ifd_offset: int, wanted: int) -> Optional[tuple]:
+        (count,) = struct.unpack_from(bo + "H", tiff, ifd_offset)
+        for k in range(count):
+            entry = struct.unpack_from(bo + "HHI4s", tiff, ifd_offset + 2 + 12 * k)
+            if entry[0] == wanted:
+                return entry
+        return None
+
+    (ifd0,) = struct.unpack_from(bo + "I", tiff, 4)
+    candidates = []
+    exif_ptr = find(ifd0, 0x8769)
+    if exif_ptr:
+        candidates.append(find(struct.unpack(bo + "I", exif_ptr[3])[0], 0x9003))
+    candidates.append(find(ifd0, 0x9003))
+    for entry in candidates:
+        if entry:
+            _, typ, count, value = entry
+            if typ != 2:  # not ASCII
+                return None
+            if count > 4:
+                (offset,) = struct.unpack(bo + "I", value)
+                value = tiff[offset:offset + count]
+                if len(value) < count:
+                    raise ValueError("truncated Exif value")
+            return value[:count].split(b"\0", 1)[0].decode("latin-1")
+    return None
+
+def _jpeg_exif_datetime_original(head: bytes) -> Optional[str]:
+    """DateTimeOriginal from the first Exif APP1 segment of a JPEG header, or None.
+
+    Raises ValueError when `head` ends before the Exif segment or start of
+    scan, so the caller can fall back to a full parse.
+    """
+    i = 2
+    while True:
+        if i + 4 > len(head):
+            raise ValueError("header truncated")
+        if head[i] != 0xFF:
+            return None
+        marker = head[i + 1]
+        if marker == 0xFF:  # fill byte
+            i += 1
+            continue
+        if marker == 0xDA:  # start of scan: no Exif
+            return None
+        seglen = int.from_bytes(head[i + 2:i + 4], "big")
+        if marker == 0xE1 and head[i + 4:i + 10] == b"Exif\0\0":
+            if i + 2 + seglen > len(head):
+                raise ValueError("header truncated")
+            return _tiff_datetime_original(head[i + 10:i + 2 + seglen])
+        i += 2 + seglen
+
+def _parse_exif_dt(value) -> Optional[datetime]:
+    if not isinstance(value, str):
+        return None
+    try:
+        return datetime.strptime(value, "%Y:%m:%d %H:%M:%S")
+    except Exception:
+        return None
+
+def read_exif_datetimes(file_bytes: Union[bytes, BinaryIO]):
     """
     Extract EXIF DateTimeOriginal / ModifyDate values when possible.
+    Accepts raw bytes or a seekable file handle (read from its current position).
     Returns (created, modified) as datetime or (None, None) on failure.
+
+    JPEGs are answered from the APP1 segment alone; other formats (and any
+    JPEG the quick reader can't handle) go through PIL. Blocking: run via
+    asyncio.to_thread.
     """
     created = modified = None
     try:
-        with Image.open(io.BytesIO(file_bytes)) as im:
+        src = io.BytesIO(file_bytes) if isinstance(file_bytes, (bytes, bytearray)) else file_bytes
+        start = src.tell()
+        head = src.read(EXIF_SCAN_BYTES)
+        if head[:2] == b"\xff\xd8":
+            try:
+                created = _parse_exif_dt(_jpeg_exif_datetime_original(head))
+            except (ValueError, struct.error):
+                pass
+            else:
+                # PIL's tag names have no "ModifyDate", so modified has always
+                # mirrored DateTimeOriginal
+                return created, created
+        src.seek(start)
+        with Image.open(src) as im:
             exif = getattr(im, "_getexif", lambda: None)() or {}
             if exif:
                 tags = {ExifTags.TAGS.get(k, k): v for k, v in exif.items()}
                 dt_original = tags.get("DateTimeOriginal") or tags.get("CreateDate")
                 dt_modified = tags.get("ModifyDate") or dt_original
-                def parse_dt(s: str):
-                    try:
-                        return datetime.strptime(s, "%Y:%m:%d %H:%M:%S")
-                    except Exception:
-                        return None
-                if isinstance(dt_original, str):
-                    created = parse_dt(dt_original)
-                if isinstance(dt_modified, str):
-                    modified = parse_dt(dt_modified)
+                created = _parse_exif_dt(dt_original)
+                modified = _parse_exif_dt(dt_modified)
     except Exception:
         pass
     return created, modified
 
+_IMMICH_BASE_HEADERS = {"Accept": "application/json"}
+
 def immich_headers(request: Optional[Request] = None) -> dict:
-    """Headers for Immich API calls using either session access token or API key."""
-    headers = {"Accept": "application/json"}
+    """Headers for Immich API calls using either session access token or API key.
+
+    Memoized on request.state, so the several Immich calls made for one
+    upload share a dict; callers copy it (`{**immich_headers(request), ...}`)
+    rather than mutating it.
+    """
+    if request is not None:
+        cached = getattr(request.state, "immich_headers", None)
+        if cached is not None:
+            return cached
     token = None
     try:
         if request is not None:
@@ -284,31 +556,43 @@ def immich_headers(request: Optional[Request] = None) -> dict:
     except Exception:
         token = None
     if token:
-        headers["Authorization"] = f"Bearer {token}"
+        headers = {**_IMMICH_BASE_HEADERS, "Authorization": f"Bearer {token}"}
     elif SETTINGS.immich_api_key:
-        headers["x-api-key"] = SETTINGS.immich_api_key
+        headers = {**_IMMICH_BASE_HEADERS, "x-api-key": SETTINGS.immich_api_key}
+    else:
+        headers = dict(_IMMICH_BASE_HEADERS)
+    if request is not None:
+        request.state.immich_headers = headers
     return headers
 
+def _album_cache_key(request: Optional[Request], album_name: str) -> Tuple[str, str]:
+    """Cache key for an album id: the Immich credential in use plus the album name."""
+    headers = immich_headers(request)
+    return (headers.get("Authorization") or headers.get("x-api-key") or "", album_name)
+
 async def get_or_create_album(request: Optional[Request] = None, album_name_override: Optional[str] = None) -> Optional[str]:
     """Get existing album by name or create a new one. Returns album ID or None.
 
     Uses a lock to prevent race conditions when multiple concurrent uploads
-    try to create the same album simultaneously.
+    try to create the same album simultaneously; resolved ids are cached per
+    credential and album name, so a burst of uploads costs one lookup per album.
     """
-    global ALBUM_ID
     album_name = album_name_override if album_name_override is not None else SETTINGS.album_name
     # Skip if no album name configured
     if not album_name:
         return None
-    # Return cached album ID if already fetched and using default settings name
-    if album_name_override is None and ALBUM_ID:
-        return ALBUM_ID
+    # Return cached album ID if already fetched
+    key = _album_cache_key(request, album_name)
+    cached = _album_ids.get(key)
+    if cached:
+        return cached
 
     # Use lock to prevent concurrent album creation race conditions
     async with _album_lock:
         # Double-check cache after acquiring lock (another request may have set it)
-        if album_name_override is None and ALBUM_ID:
-            return ALBUM_ID
+        cached = _album_ids.get(key)
+        if cached:
+            return cached
 
         try:
             # Use shared httpx client from app state
@@ -322,12 +606,10 @@ async def get_or_create_album(request: Optional[Request] = None, album_name_over
                 for album in albums:
                     if album.get("albumName") == album_name:
                         found_id = album.get("id")
-                        if album_name_override is None:
-                            ALBUM_ID = found_id
-                            logger.info(f"Found existing album '%s' with ID: %s", album_name, ALBUM_ID)
-                            return ALBUM_ID
-                        else:
-                            return found_id
+                        if found_id:
+                            _album_ids[key] = found_id
+                        logger.info("Found existing album '%s' with ID: %s", album_name, found_id)
+                        return found_id
             elif r.status_code >= 500:
                 # Server error from Immich - do not attempt to create album
                 # to avoid creating duplicates when server is having issues
@@ -346,13 +628,10 @@ async def get_or_create_album(request: Optional[Request] = None, album_name_over
             if r.status_code in (200, 201):
                 data = r.json()
                 new_id = data.get("id")
-                if album_name_override is None:
-                    ALBUM_ID = new_id
-                    logger.info("Created new album '%s' with ID: %s", album_name, ALBUM_ID)
-                    return ALBUM_ID
-                else:
-                    logger.info("Created new album '%s' with ID: %s", album_name, new_id)
-                    return new_id
+                if new_id:
+                    _album_ids[key] = new_id
+                logger.info("Created new album '%s' with ID: %s", album_name, new_id)
+                return new_id
             else:
                 logger.warning("Failed to create album: %s - %s", r.status_code, r.text)
         except Exception as e:
@@ -362,19 +641,27 @@ async def get_or_create_album(request: Optional[Request] = None, album_name_over
 
 async def add_asset_to_album(asset_id: str, request: Optional[Request] = None, album_id_override: Optional[str] = None, album_name_override: Optional[str] = None) -> bool:
     """Add an asset to the configured album. Returns True on success."""
-    album_id = album_id_override
-    if not album_id:
-        album_id = await get_or_create_album(request=request, album_name_override=album_name_override)
-    if not album_id or not asset_id:
+    if not asset_id:
         return False
 
     try:
         # Use shared httpx client from app state
         client = app.state.httpx_client
-        url = f"{SETTINGS.normalized_base_url}/albums/{album_id}/assets"
-        payload = {"ids": [asset_id]}
-        r = await client.put(url, headers={**immich_headers(request), "Content-Type": "application/json"},
-                         json=payload, timeout=10.0)
+        for attempt in range(2):
+            album_id = album_id_override
+            if not album_id:
+                album_id = await get_or_create_album(request=request, album_name_override=album_name_override)
+            if not album_id:
+                return False
+            url = f"{SETTINGS.normalized_base_url}/albums/{album_id}/assets"
+            payload = {"ids": [asset_id]}
+            r = await client.put(url, headers={**immich_headers(request), "Content-Type": "application/json"},
+                             json=payload, timeout=10.0)
+            if r.status_code not in (400, 403, 404) or album_id_override:
+                break
+            # Cached album was deleted or is no longer accessible; drop it and re-resolve once
+            album_name = album_name_override if album_name_override is not None else SETTINGS.album_name
+            _album_ids.pop(_album_cache_key(request, album_name), None)
 
         if r.status_code == 200:
             results = r.json()
@@ -430,6 +717,74 @@ async def send_progress(session_id: str, item_id: str, status: str, progress: in
         "responseId": response_id,
     })
 
+class ProgressThrottle:
+    """Turn byte-level upload progress into sparse WebSocket updates.
+
+    Sends at most one update per 50ms unless the percentage moved by 5 or
+    more, and keeps at most one send in flight; a value that arrives while a
+    send is running goes out when it finishes. Call close() once the upload
+    ends so no stale percentage follows the final done/error status.
+    """
+    MIN_INTERVAL = 0.05
+    MIN_STEP = 5
+
+    def __init__(self, session_id: str, item_id: str) -> None:
+        self.session_id = session_id
+        self.item_id = item_id
+        self.pct = 0
+        self.sent_at = 0.0
+        self.closed = False
+        self.task: Optional[asyncio.Task] = None
+
+    def update(self, done: int, total: int) -> None:
+        if not total or self.closed:
+            return
+        pct = int(done * 100 / total)
+        if pct == self.pct:
+            return
+        now = time.monotonic()
+        if pct - self.pct < self.MIN_STEP and now - self.sent_at < self.MIN_INTERVAL:
+            return
+        self.pct, self.sent_at = pct, now
+        if self.task and not self.task.done():
+            return  # the running _send picks up the new value when it finishes
+        self.task = asyncio.create_task(self._send())
+
+    async def _send(self) -> None:
+        sent = None
+        while sent != self.pct and not self.closed:
+            sent = self.pct
+            await send_progress(self.session_id, self.item_id, "uploading", sent)
+
+    def close(self) -> None:
+        """Stop sending updates (the caller reports the final status)."""
+        self.closed = True
+
+class ProgressReader:
+    """Read-through file wrapper that reports bytes consumed by the httpx multipart body."""
+
+    def __init__(self, fileobj: BinaryIO, total: int, progress: ProgressThrottle) -> None:
+        self._f = fileobj
+        self._total = total
+        self._done = 0
+        self._progress = progress
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self._f.read(size)
+        self._done += len(chunk)
+        self._progress.update(self._done, self._total)
+        return chunk
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        pos = self._f.seek(offset, whence)
+        self._done = pos
+        return pos
+
+    def tell(self) -> int:
+        # With seek(), sizes the part for Content-Length. No fileno(): on a
+        # SpooledTemporaryFile it would roll small uploads over to disk.
+        return self._f.tell()
+
 # ---------- Routes ----------
 
 @app.get("/", response_class=HTMLResponse)
@@ -456,8 +811,8 @@ async def favicon() -> Response:
     """Serve favicon from /static/favicon.png if present (avoids 404 noise)."""
     path = os.path.join(FRONTEND_DIR, "favicon.png")
     if os.path.exists(path):
-        with open(path, "rb") as f:
-            return Response(content=f.read(), media_type="image/png")
+        # FileResponse streams from a threadpool instead of a blocking read here
+        return FileResponse(path, media_type="image/png")
     return Response(status_code=204)
 
 @app.post("/api/ping")
@@ -479,6 +834,10 @@ async def api_config() -> dict:
         "version": VERSION,
     }
 
+WS_KEEPALIVE_SECONDS = 30
+# Sent as text: the frontend JSON.parses every message and ignores unknown ones
+WS_PING = '{"type":"ping"}'
+
 @app.websocket("/ws")
 async def ws_endpoint(ws: WebSocket) -> None:
     """WebSocket endpoint for pushing per-item upload progress."""
@@ -495,23 +854,16 @@ async def ws_endpoint(ws: WebSocket) -> None:
         reset_album_cache()
     await hub.connect(session_id, ws)
 
-    # keepalive to avoid proxy idle timeouts
+    # keepalive to avoid proxy idle timeouts: ping after 30s without a message
     try:
         while True:
-            msg_task = asyncio.create_task(ws.receive_text())
-            keep_task = asyncio.create_task(asyncio.sleep(30))
-            done, pending = await asyncio.wait({msg_task, keep_task}, return_when=asyncio.FIRST_COMPLETED)
-            if msg_task in done:
-                try:
-                    _ = msg_task.result()
-                except RuntimeError:
-                    # Client disconnected during receive
-                    break
-            else:
-                await ws.send_text('{"type":"ping"}')
-            for t in pending:
-                t.cancel()
+            try:
+                async with asyncio.timeout(WS_KEEPALIVE_SECONDS):
+                    await ws.receive_text()
+            except TimeoutError:
+                await ws.send_text(WS_PING)
     except (WebSocketDisconnect, RuntimeError):
+        # RuntimeError: client disconnected during receive
         pass
     finally:
         await hub.disconnect(session_id, ws)
@@ -527,11 +879,12 @@ async def api_upload(
     fingerprint: Optional[str] = Form(None),
 ):
     """Receive a file, check duplicates, forward to Immich; stream progress via WS."""
-    raw = await file.read()
-    size = len(raw)
-    checksum = sha1_hex(raw)
+    # Hash straight from the spooled upload instead of buffering it; the same
+    # handle is then read by PIL and streamed to Immich.
+    checksum, size = await asyncio.to_thread(sha1_file_hex, file.file)
 
-    exif_created, exif_modified = read_exif_datetimes(raw)
+    exif_created, exif_modified = await asyncio.to_thread(read_exif_datetimes, file.file)
+    await file.seek(0)
     created_at = exif_created or (datetime.fromtimestamp(last_modified / 1000) if last_modified else datetime.utcnow())
     modified_at = exif_modified or created_at
     created_iso = created_at.isoformat()
@@ -539,10 +892,10 @@ async def api_upload(
 
     device_asset_id = f"{file.filename}-{last_modified or 0}-{size}"
 
-    if db_lookup_checksum(checksum):
+    if await asyncio.to_thread(db_lookup_checksum, checksum):
         await send_progress(session_id, item_id, "duplicate", 100, "Duplicate (by checksum - local cache)")
         return JSONResponse({"status": "duplicate", "id": None}, status_code=200)
-    if db_lookup_device_asset(device_asset_id):
+    if await asyncio.to_thread(db_lookup_device_asset, device_asset_id):
         await send_progress(session_id, item_id, "duplicate", 100, "Already uploaded from this device (local cache)")
         return JSONResponse({"status": "duplicate", "id": None}, status_code=200)
 
@@ -550,35 +903,28 @@ async def api_upload(
     bulk = await immich_bulk_check([{"id": item_id, "checksum": checksum}])
     if bulk.get(item_id, {}).get("action") == "reject" and bulk[item_id].get("reason") == "duplicate":
         asset_id = bulk[item_id].get("assetId")
-        db_insert_upload(checksum, file.filename, size, device_asset_id, asset_id, created_iso)
+        await db_write(db_insert_upload, checksum, file.filename, size, device_asset_id, asset_id, created_iso)
         await send_progress(session_id, item_id, "duplicate", 100, "Duplicate (server)", asset_id)
         return JSONResponse({"status": "duplicate", "id": asset_id}, status_code=200)
 
     safe_name = sanitize_filename(file.filename)
-    def gen_encoder() -> MultipartEncoder:
-        return MultipartEncoder(fields={
-            "assetData": (safe_name, io.BytesIO(raw), file.content_type or "application/octet-stream"),
-            "deviceAssetId": device_asset_id,
-            "deviceId": f"python-{session_id}",
-            "fileCreatedAt": created_iso,
-            "fileModifiedAt": modified_iso,
-            "isFavorite": "false",
-            "filename": safe_name,
-            "originalFileName": safe_name,
-        })
-
-    encoder = gen_encoder()
+    form_fields = {
+        "deviceAssetId": device_asset_id,
+        "deviceId": f"python-{session_id}",
+        "fileCreatedAt": created_iso,
+        "fileModifiedAt": modified_iso,
+        "isFavorite": "false",
+        "filename": safe_name,
+        "originalFileName": safe_name,
+    }
 
     # Invite token validation (if provided)
     target_album_id: Optional[str] = None
     target_album_name: Optional[str] = None
+    reserved_use = False
     if invite_token:
         try:
-            conn = sqlite3.connect(SETTINGS.state_db)
-            cur = conn.cursor()
-            cur.execute("SELECT token, album_id, album_name, max_uses, used_count, expires_at, COALESCE(claimed,0), claimed_by_session, password_hash, COALESCE(disabled,0) FROM invites WHERE token = ?", (invite_token,))
-            row = cur.fetchone()
-            conn.close()
+            row = await get_invite(invite_token)
         except Exception as e:
             logger.exception("Invite lookup error: %s", e)
             row = None
@@ -617,67 +963,69 @@ async def api_upload(
         except Exception:
             max_uses_int = -1
         if max_uses_int == 1:
-            # Already claimed?
-            if claimed:
-                # Allow same session to continue; block different sessions
-                if claimed_by_session and claimed_by_session != session_id:
-                    await send_progress(session_id, item_id, "error", 100, "Invite already used")
-                    return JSONResponse({"error": "invite_claimed"}, status_code=403)
-                # claimed by same session (or unknown): allow
-            else:
-                # Atomically claim the one-time invite to prevent concurrent use
+            # A claim by this session is permanent until an admin reset (which
+            # drops the cached row), so only unclaimed or foreign-claimed rows
+            # go to the DB for the atomic claim
+            owner = claimed_by_session if claimed and claimed_by_session == session_id else None
+            if owner is None:
                 try:
-                    connc = sqlite3.connect(SETTINGS.state_db)
-                    curc = connc.cursor()
-                    curc.execute(
-                        "UPDATE invites SET claimed = 1, claimed_at = CURRENT_TIMESTAMP, claimed_by_session = ? WHERE token = ? AND (claimed IS NULL OR claimed = 0)",
-                        (session_id, invite_token)
-                    )
-                    connc.commit()
-                    changed = connc.total_changes
-                    connc.close()
+                    owner = await db_write(db_claim_invite, invite_token, session_id)
                 except Exception as e:
                     logger.exception("Invite claim failed: %s", e)
                     return JSONResponse({"error": "invite_claim_failed"}, status_code=500)
-                if changed == 0:
-                    # Someone else just claimed; re-check owner
-                    try:
-                        conn2 = sqlite3.connect(SETTINGS.state_db)
-                        cur2 = conn2.cursor()
-                        cur2.execute("SELECT claimed_by_session FROM invites WHERE token = ?", (invite_token,))
-                        owner_row = cur2.fetchone()
-                        conn2.close()
-                        owner = owner_row[0] if owner_row else None
-                    except Exception:
-                        owner = None
-                    if not owner or owner != session_id:
-                        await send_progress(session_id, item_id, "error", 100, "Invite already used")
-                        return JSONResponse({"error": "invite_claimed"}, status_code=403)
+                # Re-read the claimed row next time so later files skip the claim
+                invalidate_invite_cache(invite_token)
+            # Block other sessions, and invites deleted since the lookup
+            if owner != session_id:
+                await send_progress(session_id, item_id, "error", 100, "Invite already used")
+                return JSONResponse({"error": "invite_claimed"}, status_code=403)
         else:
-            # Usage check for multi-use (max_uses < 0 => indefinite)
-            if (used_count or 0) >= (max_uses_int if max_uses_int >= 0 else 10**9):
+            # Multi-use (max_uses < 0 => indefinite): reserve a use up front so
+            # concurrent uploads cannot overrun the limit; released on failure
+            try:
+                reserved = await reserve_invite_use(invite_token)
+            except Exception as e:
+                logger.exception("Invite usage reservation failed: %s", e)
+                return JSONResponse({"error": "invite_claim_failed"}, status_code=500)
+            if not reserved:
                 await send_progress(session_id, item_id, "error", 100, "Invite already used up")
                 return JSONResponse({"error": "invite_exhausted"}, status_code=403)
+            reserved_use = True
         target_album_id = album_id
         target_album_name = album_name
 
     async def do_upload():
         await send_progress(session_id, item_id, "uploading", 0, "Uploading…")
-        sent = {"pct": 0}
-        def cb(monitor: MultipartEncoderMonitor) -> None:
-            if monitor.len:
-                pct = int(monitor.bytes_read * 100 / monitor.len)
-                if pct != sent["pct"]:
-                    sent["pct"] = pct
-                    asyncio.create_task(send_progress(session_id, item_id, "uploading", pct))
-        monitor = MultipartEncoderMonitor(encoder, cb)
-        headers = {"Accept": "application/json", "Content-Type": monitor.content_type, "x-immich-checksum": checksum, **immich_headers(request)}
+        progress = ProgressThrottle(session_id, item_id)
+        asset_data = ProgressReader(file.file, size, progress)
+        headers = {"Accept": "application/json", "x-immich-checksum": checksum, **immich_headers(request)}
+        stored = False
         try:
-            r = requests.post(f"{SETTINGS.normalized_base_url}/assets", headers=headers, data=monitor, timeout=120)
+            try:
+                r = await app.state.httpx_client.post(
+                    f"{SETTINGS.normalized_base_url}/assets",
+                    headers=headers,
+                    data=form_fields,
+                    files={"assetData": (safe_name, asset_data, file.content_type or "application/octet-stream")},
+                    timeout=UPLOAD_TIMEOUT,
+                )
+            finally:
+                progress.close()
             if r.status_code in (200, 201):
+                stored = True
                 data = r.json()
                 asset_id = data.get("id")
-                db_insert_upload(checksum, file.filename, size, device_asset_id, asset_id, created_iso)
+                # Record the upload, invite usage and uploader identity in one transaction
+                ip = None
+                try:
+                    ip = (request.client.host if request and request.client else None) or request.headers.get('x-forwarded-for')
+                except Exception:
+                    ip = None
+                ua = request.headers.get('user-agent', '') if request else ''
+                try:
+                    await db_write(db_record_upload, checksum, file.filename, size, device_asset_id, asset_id, created_iso, invite_token, ip, ua, fingerprint or '')
+                except Exception as e:
+                    logger.exception("Failed to record upload: %s", e)
                 status = data.get("status", "created")
                 
                 # Add to album if configured (invite overrides .env)
@@ -695,61 +1043,6 @@ async def api_upload(
 
                 await send_progress(session_id, item_id, "duplicate" if status == "duplicate" else "done", 100, status, asset_id)
 
-                # Increment invite usage on success
-                if invite_token:
-                    try:
-                        conn2 = sqlite3.connect(SETTINGS.state_db)
-                        cur2 = conn2.cursor()
-                        # Keep one-time used_count at 1; multi-use increments per asset
-                        cur2.execute("SELECT max_uses FROM invites WHERE token = ?", (invite_token,))
-                        row_mu = cur2.fetchone()
-                        mx = None
-                        try:
-                            mx = int(row_mu[0]) if row_mu and row_mu[0] is not None else None
-                        except Exception:
-                            mx = None
-                        if mx == 1:
-                            cur2.execute("UPDATE invites SET used_count = 1 WHERE token = ?", (invite_token,))
-                        else:
-                            cur2.execute("UPDATE invites SET used_count = used_count + 1 WHERE token = ?", (invite_token,))
-                        conn2.commit()
-                        conn2.close()
-                    except Exception as e:
-                        logger.exception("Failed to increment invite usage: %s", e)
-                # Log uploader identity and file metadata
-                try:
-                    connlg = sqlite3.connect(SETTINGS.state_db)
-                    curlg = connlg.cursor()
-                    curlg.execute(
-                        """
-                        CREATE TABLE IF NOT EXISTS upload_events (
-                            id INTEGER PRIMARY KEY AUTOINCREMENT,
-                            token TEXT,
-                            uploaded_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                            ip TEXT,
-                            user_agent TEXT,
-                            fingerprint TEXT,
-                            filename TEXT,
-                            size INTEGER,
-                            checksum TEXT,
-                            immich_asset_id TEXT
-                        );
-                        """
-                    )
-                    ip = None
-                    try:
-                        ip = (request.client.host if request and request.client else None) or request.headers.get('x-forwarded-for')
-                    except Exception:
-                        ip = None
-                    ua = request.headers.get('user-agent', '') if request else ''
-                    curlg.execute(
-                        "INSERT INTO upload_events (token, ip, user_agent, fingerprint, filename, size, checksum, immich_asset_id) VALUES (?,?,?,?,?,?,?,?)",
-                        (invite_token or '', ip, ua, fingerprint or '', file.filename, size, checksum, asset_id or None)
-                    )
-                    connlg.commit()
-                    connlg.close()
-                except Exception:
-                    pass
                 return JSONResponse({"id": asset_id, "status": status}, status_code=200)
             else:
                 try:
@@ -762,11 +1055,69 @@ async def api_upload(
             logger.exception("upload failed (session=%s item=%s)", session_id, item_id)
             await send_progress(session_id, item_id, "error", 100, "upload failed")
             return JSONResponse({"error": "upload failed"}, status_code=500)
+        finally:
+            if reserved_use and not stored:
+                await release_invite_use(invite_token)
 
     return await do_upload()
 
 # --------- Chunked upload endpoints ---------
 
+def _copy_into(src: BinaryIO, dst: BinaryIO) -> None:
+    """Append src to dst, in-kernel via copy_file_range where supported."""
+    if hasattr(os, "copy_file_range"):
+        dst.flush()
+        try:
+            while os.copy_file_range(src.fileno(), dst.fileno(), 1 << 30):
+                pass
+            return
+        except OSError:
+            # ENOSYS/EXDEV/EINVAL on older kernels or filesystems: finish in
+            # userspace from where the kernel copy stopped (src is unbuffered;
+            # re-sync dst's buffered position with the fd offset)
+            dst.seek(0, os.SEEK_END)
+    shutil.copyfileobj(src, dst, 1 << 20)
+    dst.flush()
+
+def assemble_chunks(d: str, total_chunks: int) -> BinaryIO:
+    """Concatenate part files into one anonymous temp file, positioned at 0."""
+    out = tempfile.TemporaryFile(dir=CHUNK_ROOT)
+    try:
+        for i in range(total_chunks):
+            with open(os.path.join(d, f"part_{i:06d}"), "rb", buffering=0) as f:
+                _copy_into(f, out)
+        out.seek(0)
+        return out
+    except BaseException:
+        out.close()
+        raise
+
+# Running SHA-1 per chunked upload (keyed by chunk dir): [next part index,
+# hasher, last touched, bytes hashed, part being hashed]. Parts arrive in order
+# from the frontend, so completion can finalize the checksum without re-reading
+# the file. A gap, re-sent part, or part arriving while the previous one is
+# still being hashed drops the entry and completion hashes the assembled file.
+_chunk_hashes: Dict[str, list] = {}
+CHUNK_HASH_TTL = 3600.0
+
+def _track_chunk_hash(d: str, index: int) -> Optional[list]:
+    """Return the hash state to feed part `index` into, or None if untracked."""
+    now = time.monotonic()
+    if index == 0:
+        for key in [k for k, v in _chunk_hashes.items() if now - v[2] > CHUNK_HASH_TTL]:
+            del _chunk_hashes[key]
+        state = _chunk_hashes[d] = [0, new_sha1(), now, 0, False]
+    else:
+        state = _chunk_hashes.get(d)
+        if not state or state[4] or state[0] != index:
+            _chunk_hashes.pop(d, None)
+            return None
+    # Index and byte count advance only once the update has run (see
+    # api_upload_chunk), so a later part can't be hashed ahead of this one
+    state[4] = True
+    state[2] = now
+    return state
+
 def _chunk_dir(session_id: str, item_id: str) -> str:
     """Build a chunk-storage path that is provably inside CHUNK_ROOT.
 
@@ -845,7 +1196,14 @@ async def api_upload_chunk(
             f.write(content)
     except Exception as e:
         logger.exception("Chunk write failed: %s", e)
+        _chunk_hashes.pop(d, None)
         return JSONResponse({"error": "chunk_write_failed"}, status_code=500)
+    hash_state = _track_chunk_hash(d, int(chunk_index))
+    if hash_state is not None:
+        await asyncio.to_thread(hash_state[1].update, content)
+        hash_state[0] += 1
+        hash_state[3] += len(content)
+        hash_state[4] = False
     return JSONResponse({"ok": True})
 
 @app.post("/api/upload/chunk/complete")
@@ -865,6 +1223,7 @@ async def api_upload_chunk_complete(request: Request) -> JSONResponse:
     if not item_id or not session_id:
         return JSONResponse({"error": "missing_ids"}, status_code=400)
     d = _chunk_dir(session_id, item_id)
+    hash_state = _chunk_hashes.pop(d, None)
     meta_path = os.path.join(d, "meta.json")
     # Basic validation
     try:
@@ -883,16 +1242,12 @@ async def api_upload_chunk_complete(request: Request) -> JSONResponse:
             pass
     if not name:
         name = "upload.bin"
-    # Assemble
-    parts = []
+    # Assemble into an unlinked temp file rather than joining the parts in memory
+    for i in range(total_chunks):
+        if not os.path.exists(os.path.join(d, f"part_{i:06d}")):
+            return JSONResponse({"error": "missing_part", "index": i}, status_code=400)
     try:
-        for i in range(total_chunks):
-            p = os.path.join(d, f"part_{i:06d}")
-            if not os.path.exists(p):
-                return JSONResponse({"error": "missing_part", "index": i}, status_code=400)
-            with open(p, "rb") as f:
-                parts.append(f.read())
-        raw = b"".join(parts)
+        assembled = await asyncio.to_thread(assemble_chunks, d, total_chunks)
     except Exception as e:
         logger.exception("Assemble failed: %s", e)
         return JSONResponse({"error": "assemble_failed"}, status_code=500)
@@ -914,13 +1269,28 @@ async def api_upload_chunk_complete(request: Request) -> JSONResponse:
     except Exception:
         pass
 
-    # Now reuse the core logic from api_upload but with assembled bytes
+    # Checksum accumulated while the parts arrived, if every part was hashed in order
+    checksum = None
+    if hash_state and hash_state[0] == total_chunks and hash_state[3] == os.fstat(assembled.fileno()).st_size:
+        checksum = hash_state[1].hexdigest()
+    try:
+        return await _upload_assembled(request, assembled, item_id, session_id, name, last_modified, invite_token, fingerprint, content_type, checksum)
+    finally:
+        assembled.close()
+
+async def _upload_assembled(request: Request, assembled: BinaryIO, item_id: str, session_id: str, name: str,
+                            last_modified: Optional[int], invite_token: Optional[str], fingerprint: Optional[str],
+                            content_type: str, checksum: Optional[str] = None) -> JSONResponse:
+    """Run the regular upload flow (dedupe, invite gating, Immich POST) on an assembled chunked file."""
     item_id_local = item_id
     session_id_local = session_id
     file_like_name = name
-    file_size = len(raw)
-    checksum = sha1_hex(raw)
-    exif_created, exif_modified = read_exif_datetimes(raw)
+    if checksum is None:
+        checksum, file_size = await asyncio.to_thread(sha1_file_hex, assembled)
+    else:
+        file_size = os.fstat(assembled.fileno()).st_size
+    exif_created, exif_modified = await asyncio.to_thread(read_exif_datetimes, assembled)
+    assembled.seek(0)
     created_at = exif_created or (datetime.fromtimestamp(last_modified / 1000) if last_modified else datetime.utcnow())
     modified_at = exif_modified or created_at
     created_iso = created_at.isoformat()
@@ -928,10 +1298,10 @@ async def api_upload_chunk_complete(request: Request) -> JSONResponse:
     device_asset_id = f"{file_like_name}-{last_modified or 0}-{file_size}"
 
     # Local duplicate checks
-    if db_lookup_checksum(checksum):
+    if await asyncio.to_thread(db_lookup_checksum, checksum):
         await send_progress(session_id_local, item_id_local, "duplicate", 100, "Duplicate (by checksum - local cache)")
         return JSONResponse({"status": "duplicate", "id": None}, status_code=200)
-    if db_lookup_device_asset(device_asset_id):
+    if await asyncio.to_thread(db_lookup_device_asset, device_asset_id):
         await send_progress(session_id_local, item_id_local, "duplicate", 100, "Already uploaded from this device (local cache)")
         return JSONResponse({"status": "duplicate", "id": None}, status_code=200)
 
@@ -939,33 +1309,28 @@ async def api_upload_chunk_complete(request: Request) -> JSONResponse:
     bulk = await immich_bulk_check([{ "id": item_id_local, "checksum": checksum }])
     if bulk.get(item_id_local, {}).get("action") == "reject" and bulk[item_id_local].get("reason") == "duplicate":
         asset_id = bulk[item_id_local].get("assetId")
-        db_insert_upload(checksum, file_like_name, file_size, device_asset_id, asset_id, created_iso)
+        await db_write(db_insert_upload, checksum, file_like_name, file_size, device_asset_id, asset_id, created_iso)
         await send_progress(session_id_local, item_id_local, "duplicate", 100, "Duplicate (server)", asset_id)
         return JSONResponse({"status": "duplicate", "id": asset_id}, status_code=200)
 
     safe_name2 = sanitize_filename(file_like_name)
-    def gen_encoder2() -> MultipartEncoder:
-        return MultipartEncoder(fields={
-            "assetData": (safe_name2, io.BytesIO(raw), content_type or "application/octet-stream"),
-            "deviceAssetId": device_asset_id,
-            "deviceId": f"python-{session_id_local}",
-            "fileCreatedAt": created_iso,
-            "fileModifiedAt": modified_iso,
-            "isFavorite": "false",
-            "filename": safe_name2,
-            "originalFileName": safe_name2,
-        })
+    form_fields2 = {
+        "deviceAssetId": device_asset_id,
+        "deviceId": f"python-{session_id_local}",
+        "fileCreatedAt": created_iso,
+        "fileModifiedAt": modified_iso,
+        "isFavorite": "false",
+        "filename": safe_name2,
+        "originalFileName": safe_name2,
+    }
 
     # Invite validation/gating mirrors api_upload
     target_album_id: Optional[str] = None
     target_album_name: Optional[str] = None
+    reserved_use = False
     if invite_token:
         try:
-            conn = sqlite3.connect(SETTINGS.state_db)
-            cur = conn.cursor()
-            cur.execute("SELECT token, album_id, album_name, max_uses, used_count, expires_at, COALESCE(claimed,0), claimed_by_session, password_hash, COALESCE(disabled,0) FROM invites WHERE token = ?", (invite_token,))
-            row = cur.fetchone()
-            conn.close()
+            row = await get_invite(invite_token)
         except Exception as e:
             logger.exception("Invite lookup error: %s", e)
             row = None
@@ -1002,61 +1367,62 @@ async def api_upload_chunk_complete(request: Request) -> JSONResponse:
         except Exception:
             max_uses_int = -1
         if max_uses_int == 1:
-            if claimed:
-                if claimed_by_session and claimed_by_session != session_id_local:
-                    await send_progress(session_id_local, item_id_local, "error", 100, "Invite already used")
-                    return JSONResponse({"error": "invite_claimed"}, status_code=403)
-            else:
+            owner = claimed_by_session if claimed and claimed_by_session == session_id_local else None
+            if owner is None:
                 try:
-                    connc = sqlite3.connect(SETTINGS.state_db)
-                    curc = connc.cursor()
-                    curc.execute(
-                        "UPDATE invites SET claimed = 1, claimed_at = CURRENT_TIMESTAMP, claimed_by_session = ? WHERE token = ? AND (claimed IS NULL OR claimed = 0)",
-                        (session_id_local, invite_token)
-                    )
-                    connc.commit()
-                    changed = connc.total_changes
-                    connc.close()
+                    owner = await db_write(db_claim_invite, invite_token, session_id_local)
                 except Exception as e:
                     logger.exception("Invite claim failed: %s", e)
                     return JSONResponse({"error": "invite_claim_failed"}, status_code=500)
-                if changed == 0:
-                    try:
-                        conn2 = sqlite3.connect(SETTINGS.state_db)
-                        cur2 = conn2.cursor()
-                        cur2.execute("SELECT claimed_by_session FROM invites WHERE token = ?", (invite_token,))
-                        owner_row = cur2.fetchone()
-                        conn2.close()
-                        owner = owner_row[0] if owner_row else None
-                    except Exception:
-                        owner = None
-                    if not owner or owner != session_id_local:
-                        await send_progress(session_id_local, item_id_local, "error", 100, "Invite already used")
-                        return JSONResponse({"error": "invite_claimed"}, status_code=403)
+                # Re-read the claimed row next time so later files skip the claim
+                invalidate_invite_cache(invite_token)
+            if owner != session_id_local:
+                await send_progress(session_id_local, item_id_local, "error", 100, "Invite already used")
+                return JSONResponse({"error": "invite_claimed"}, status_code=403)
         else:
-            if (used_count or 0) >= (max_uses_int if max_uses_int >= 0 else 10**9):
+            try:
+                reserved = await reserve_invite_use(invite_token)
+            except Exception as e:
+                logger.exception("Invite usage reservation failed: %s", e)
+                return JSONResponse({"error": "invite_claim_failed"}, status_code=500)
+            if not reserved:
                 await send_progress(session_id_local, item_id_local, "error", 100, "Invite already used up")
                 return JSONResponse({"error": "invite_exhausted"}, status_code=403)
+            reserved_use = True
         target_album_id = album_id
         target_album_name = album_name
 
     await send_progress(session_id_local, item_id_local, "uploading", 0, "Uploading…")
-    sent = {"pct": 0}
-    def cb2(monitor: MultipartEncoderMonitor) -> None:
-        if monitor.len:
-            pct = int(monitor.bytes_read * 100 / monitor.len)
-            if pct != sent["pct"]:
-                sent["pct"] = pct
-                asyncio.create_task(send_progress(session_id_local, item_id_local, "uploading", pct))
-    encoder2 = gen_encoder2()
-    monitor2 = MultipartEncoderMonitor(encoder2, cb2)
-    headers = {"Accept": "application/json", "Content-Type": monitor2.content_type, "x-immich-checksum": checksum, **immich_headers(request)}
+    progress2 = ProgressThrottle(session_id_local, item_id_local)
+    asset_data2 = ProgressReader(assembled, file_size, progress2)
+    headers = {"Accept": "application/json", "x-immich-checksum": checksum, **immich_headers(request)}
+    stored = False
     try:
-        r = requests.post(f"{SETTINGS.normalized_base_url}/assets", headers=headers, data=monitor2, timeout=120)
+        try:
+            r = await app.state.httpx_client.post(
+                f"{SETTINGS.normalized_base_url}/assets",
+                headers=headers,
+                data=form_fields2,
+                files={"assetData": (safe_name2, asset_data2, content_type or "application/octet-stream")},
+                timeout=UPLOAD_TIMEOUT,
+            )
+        finally:
+            progress2.close()
         if r.status_code in (200, 201):
+            stored = True
             data_r = r.json()
             asset_id = data_r.get("id")
-            db_insert_upload(checksum, file_like_name, file_size, device_asset_id, asset_id, created_iso)
+            # Record the upload, invite usage and uploader identity in one transaction
+            ip = None
+            try:
+                ip = (request.client.host if request and request.client else None) or request.headers.get('x-forwarded-for')
+            except Exception:
+                ip = None
+            ua = request.headers.get('user-agent', '') if request else ''
+            try:
+                await db_write(db_record_upload, checksum, file_like_name, file_size, device_asset_id, asset_id, created_iso, invite_token, ip, ua, fingerprint or '')
+            except Exception as e:
+                logger.exception("Failed to record upload: %s", e)
             status = data_r.get("status", "created")
             if asset_id:
                 added = False
@@ -1070,59 +1436,6 @@ async def api_upload_chunk_complete(request: Request) -> JSONResponse:
                     if await add_asset_to_album(asset_id, request=request):
                         status += f" (added to album '{SETTINGS.album_name}')"
             await send_progress(session_id_local, item_id_local, "duplicate" if status == "duplicate" else "done", 100, status, asset_id)
-            if invite_token:
-                try:
-                    conn2 = sqlite3.connect(SETTINGS.state_db)
-                    cur2 = conn2.cursor()
-                    cur2.execute("SELECT max_uses FROM invites WHERE token = ?", (invite_token,))
-                    row_mu = cur2.fetchone()
-                    mx = None
-                    try:
-                        mx = int(row_mu[0]) if row_mu and row_mu[0] is not None else None
-                    except Exception:
-                        mx = None
-                    if mx == 1:
-                        cur2.execute("UPDATE invites SET used_count = 1 WHERE token = ?", (invite_token,))
-                    else:
-                        cur2.execute("UPDATE invites SET used_count = used_count + 1 WHERE token = ?", (invite_token,))
-                    conn2.commit()
-                    conn2.close()
-                except Exception as e:
-                    logger.exception("Failed to increment invite usage: %s", e)
-            # Log uploader identity and file metadata
-            try:
-                connlg = sqlite3.connect(SETTINGS.state_db)
-                curlg = connlg.cursor()
-                curlg.execute(
-                    """
-                    CREATE TABLE IF NOT EXISTS upload_events (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        token TEXT,
-                        uploaded_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                        ip TEXT,
-                        user_agent TEXT,
-                        fingerprint TEXT,
-                        filename TEXT,
-                        size INTEGER,
-                        checksum TEXT,
-                        immich_asset_id TEXT
-                    );
-                    """
-                )
-                ip = None
-                try:
-                    ip = (request.client.host if request and request.client else None) or request.headers.get('x-forwarded-for')
-                except Exception:
-                    ip = None
-                ua = request.headers.get('user-agent', '') if request else ''
-                curlg.execute(
-                    "INSERT INTO upload_events (token, ip, user_agent, fingerprint, filename, size, checksum, immich_asset_id) VALUES (?,?,?,?,?,?,?,?)",
-                    (invite_token or '', ip, ua, fingerprint or '', file_like_name, file_size, checksum, asset_id or None)
-                )
-                connlg.commit()
-                connlg.close()
-            except Exception:
-                pass
             return JSONResponse({"id": asset_id, "status": status}, status_code=200)
         else:
             try:
@@ -1135,6 +1448,9 @@ async def api_upload_chunk_complete(request: Request) -> JSONResponse:
         logger.exception("chunk upload failed (session=%s item=%s)", session_id_local, item_id_local)
         await send_progress(session_id_local, item_id_local, "error", 100, "upload failed")
         return JSONResponse({"error": "upload failed"}, status_code=500)
+    finally:
+        if reserved_use and not stored:
+            await release_invite_use(invite_token)
 
 @app.post("/api/album/reset")
 async def api_album_reset() -> dict:
@@ -1599,6 +1915,7 @@ async def api_invite_update(token: str, request: Request) -> JSONResponse:
             conn.commit()
             updated = conn.total_changes
             conn.close()
+            invalidate_invite_cache(token)
         else:
             updated = 0
     except Exception as e:
@@ -1635,6 +1952,7 @@ async def api_invites_bulk(request: Request) -> JSONResponse:
         conn.commit()
         changed = conn.total_changes
         conn.close()
+        invalidate_invite_cache(*tokens)
     except Exception as e:
         logger.exception("Bulk update failed: %s", e)
         return JSONResponse({"error": "db_error"}, status_code=500)
@@ -1673,6 +1991,7 @@ async def api_invites_delete(request: Request) -> JSONResponse:
         conn.commit()
         changed = conn.total_changes
         conn.close()
+        invalidate_invite_cache(*tokens)
     except Exception as e:
         logger.exception("Bulk delete failed: %s", e)
         return JSONResponse({"error": "db_error"}, status_code=500)
@@ -10,20 +10,20 @@ import re
 import shutil
 import tempfile
 import asyncio
-import hashlib
+import functools
 import ipaddress
 import logging
 import signal
 import socket
 from pathlib import Path
-from typing import Optional, List, TYPE_CHECKING
+from typing import AsyncIterator, Optional, List, Tuple, TYPE_CHECKING
 from urllib.parse import urlparse, parse_qs, unquote
 from dataclasses import dataclass
 import json
 
 import httpx
 
-from .utils import detect_file_type
+from .utils import detect_file_type, new_sha1
 
 if TYPE_CHECKING:
     from .config import Settings
@@ -39,6 +39,7 @@ class DownloadResult:
     content_type: Optional[str] = None
     error: Optional[str] = None
     metadata: Optional[dict] = None
+    sha1: Optional[str] = None  # hex digest when known at download time
 
 
 # Supported platforms and their URL patterns
@@ -199,13 +200,24 @@ def _ensure_public_url(url: str) -> str:
     return url
 
 
+# All SUPPORTED_PATTERNS folded into one anchored alternation, one named group
+# per platform. Alternatives are tried in dict order, so the first matching
+# platform wins exactly as with the per-pattern loop this replaces.
+_PLATFORM_RE = re.compile(
+    "|".join(
+        f"(?P<{platform}>{'|'.join(patterns)})"
+        for platform, patterns in SUPPORTED_PATTERNS.items()
+    ),
+    re.IGNORECASE,
+)
+
+
+@functools.lru_cache(maxsize=1024)
 def identify_platform(url: str) -> Optional[str]:
-    """Identify which platform a URL belongs to"""
-    for platform, patterns in SUPPORTED_PATTERNS.items():
-        for pattern in patterns:
-            if re.match(pattern, url, re.IGNORECASE):
-                return platform
-    return None
+    """Identify which platform a URL belongs to (memoized; the same URL is
+    classified by the router, the cookie lookup and the downloader)"""
+    m = _PLATFORM_RE.match(url)
+    return m.lastgroup if m else None
 
 
 def is_direct_image_url(url: str) -> bool:
@@ -342,12 +354,15 @@ async def download_direct_image(
                 ext = ".jpg"
 
             # Generate filename from URL hash
-            url_hash = hashlib.sha1(url.encode()).hexdigest()[:12]
+            url_hash = new_sha1(url.encode()).hexdigest()[:12]
             filename = f"direct_{url_hash}{ext}"
             filepath = os.path.join(output_dir, filename)
 
             with open(filepath, "wb") as f:
                 f.write(data)
+            # Hash while the body is still in memory so the upload path
+            # doesn't have to re-read the file from disk.
+            sha1 = new_sha1(data).hexdigest()
 
             logger.info(
                 "Direct image downloaded: %s (size=%d bytes, type=%s)",
@@ -360,6 +375,7 @@ async def download_direct_image(
                 filename=filename,
                 content_type=content_type,
                 metadata={"source": "direct_image", "url": url},
+                sha1=sha1,
             )
 
     except httpx.HTTPStatusError as e:
@@ -729,32 +745,54 @@ async def download_from_url(
         )
 
 
-async def download_multiple_urls(
+async def iter_multiple_urls(
     urls: List[str],
     output_dir: Optional[str] = None,
     cookies_file: Optional[str] = None,
     settings: Optional[Settings] = None,
-) -> List[DownloadResult]:
-    """Download multiple URLs with concurrency limited by semaphore."""
+    cookies_files: Optional[List[Optional[str]]] = None,
+) -> AsyncIterator[Tuple[int, List[DownloadResult]]]:
+    """Download multiple URLs with concurrency limited by semaphore, yielding
+    (url index, results) as each URL finishes so callers can start on the
+    fast ones while slow ones are still downloading.
+
+    `cookies_files`, when given, holds one cookie file per URL (aligned with
+    `urls`) and takes precedence over the batch-wide `cookies_file`.
+    """
     if output_dir is None:
         output_dir = tempfile.mkdtemp(prefix="immich_drop_batch_")
 
     concurrency = max(1, settings.download_concurrency if settings else 1)
     sem = asyncio.Semaphore(concurrency)
 
-    async def _download_with_sem(url: str, sub_dir: str) -> List[DownloadResult]:
+    async def _download_with_sem(index: int, url: str, sub_dir: str) -> Tuple[int, List[DownloadResult]]:
+        url_cookies = cookies_files[index] if cookies_files is not None else cookies_file
         async with sem:
-            return await download_from_url_multi(url, sub_dir, cookies_file, settings=settings)
+            return index, await download_from_url_multi(url, sub_dir, url_cookies, settings=settings)
 
     tasks = []
     for i, url in enumerate(urls):
         sub_dir = os.path.join(output_dir, f"item_{i}")
         os.makedirs(sub_dir, exist_ok=True)
-        tasks.append(_download_with_sem(url, sub_dir))
+        tasks.append(asyncio.create_task(_download_with_sem(i, url, sub_dir)))
 
-    nested_results = await asyncio.gather(*tasks)
-    # Flatten: download_from_url_multi returns List[DownloadResult] per URL
-    return [r for sublist in nested_results for r in sublist]
+    yielded = set()
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            index, results = await next_done
+            yielded.add(index)
+            yield index, results
+    finally:
+        # Caller stopped early (error, cancelled request, aclose()): stop the
+        # remaining downloads and drop whatever they wrote. Yielded items
+        # belong to the caller, which cleans them up.
+        pending = [t for t in tasks if not t.done()]
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        for i in range(len(urls)):
+            if i not in yielded:
+                shutil.rmtree(os.path.join(output_dir, f"item_{i}"), ignore_errors=True)
 
 
 async def download_from_url_multi(
@@ -2,6 +2,26 @@
 Shared utility functions for immich-drop
 """
 
+import hashlib
+
+
+def new_sha1(data: bytes = b""):
+    """SHA-1 hasher for content checksums (Immich dedupe keys, not security).
+
+    usedforsecurity=False keeps SHA-1 available on FIPS-mode OpenSSL builds,
+    where the default constructor is blocked.
+    """
+    return hashlib.sha1(data, usedforsecurity=False)
+
+
+# ISO-BMFF (ftyp box) major brands -> (extension, mime type)
+_FTYP_BRANDS = {
+    **dict.fromkeys((b'heic', b'heix', b'hevc', b'hevx', b'mif1'), ('.heic', 'image/heic')),
+    b'avif': ('.avif', 'image/avif'),
+    # MP4/MOV video formats
+    **dict.fromkeys((b'isom', b'iso2', b'mp41', b'mp42', b'M4V ', b'M4A '), ('.mp4', 'video/mp4')),
+    b'qt  ': ('.mov', 'video/quicktime'),
+}
 
 def detect_file_type(data: bytes) -> tuple[str, str]:
     """
@@ -27,18 +47,11 @@ def detect_file_type(data: bytes) -> tuple[str, str]:
     if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
         return '.webp', 'image/webp'
 
-    # HEIC/HEIF/AVIF: ftyp box with brand
+    # HEIC/HEIF/AVIF/MP4/MOV: ftyp box with brand, one dict lookup
     if data[4:8] == b'ftyp':
-        brand = data[8:12]
-        if brand in (b'heic', b'heix', b'hevc', b'hevx', b'mif1'):
-            return '.heic', 'image/heic'
-        if brand == b'avif':
-            return '.avif', 'image/avif'
-        # MP4/MOV video formats
-        if brand in (b'isom', b'iso2', b'mp41', b'mp42', b'M4V ', b'M4A '):
-            return '.mp4', 'video/mp4'
-        if brand == b'qt  ':
-            return '.mov', 'video/quicktime'
+        detected = _FTYP_BRANDS.get(data[8:12])
+        if detected:
+            return detected
 
     # BMP: BM
     if data[:2] == b'BM':
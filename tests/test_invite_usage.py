@@ -0,0 +1,67 @@
+"""Invite usage accounting for /api/upload and chunked uploads."""
+import os
+import sqlite3
+import tempfile
+
+os.environ["STATE_DB"] = os.path.join(tempfile.mkdtemp(), "state.db")
+
+from app import app as drop  # noqa: E402
+
+drop.ensure_invites_table()
+
+
+def _invite(token: str, max_uses: int) -> None:
+    with sqlite3.connect(drop.SETTINGS.state_db) as conn:
+        conn.execute("INSERT INTO invites (token, max_uses) VALUES (?, ?)", (token, max_uses))
+
+
+def _used(token: str) -> int:
+    with sqlite3.connect(drop.SETTINGS.state_db) as conn:
+        return conn.execute("SELECT used_count FROM invites WHERE token = ?", (token,)).fetchone()[0]
+
+
+def test_reserve_stops_at_max_uses():
+    _invite("multi", 2)
+    assert drop.db_reserve_invite_use("multi")
+    assert drop.db_reserve_invite_use("multi")
+    # Exhausted before the upload starts, not after Immich stored the asset
+    assert not drop.db_reserve_invite_use("multi")
+    assert _used("multi") == 2
+
+
+def test_release_frees_a_use_after_failed_upload():
+    _invite("retry", 2)
+    assert drop.db_reserve_invite_use("retry")
+    assert drop.db_reserve_invite_use("retry")
+    drop.db_release_invite_use("retry")
+    assert _used("retry") == 1
+    assert drop.db_reserve_invite_use("retry")
+
+
+def test_unlimited_and_unknown_invites():
+    _invite("unlimited", -1)
+    for _ in range(5):
+        assert drop.db_reserve_invite_use("unlimited")
+    assert not drop.db_reserve_invite_use("missing")
+
+
+def test_record_upload_does_not_count_reserved_use_twice():
+    _invite("recorded", 3)
+    assert drop.db_reserve_invite_use("recorded")
+    drop.db_record_upload("c1", "a.jpg", 1, "dev-1", "asset-1", "2026-01-01T00:00:00Z", "recorded", None, "", "")
+    assert _used("recorded") == 1
+
+
+def test_record_upload_marks_one_time_invite_used():
+    _invite("once", 1)
+    drop.db_record_upload("c2", "b.jpg", 1, "dev-2", "asset-2", "2026-01-01T00:00:00Z", "once", None, "", "")
+    assert _used("once") == 1
+
+
+def test_claim_one_time_invite():
+    _invite("claim", 1)
+    assert drop.db_claim_invite("claim", "s1") == "s1"
+    # Owner may keep uploading; other sessions and deleted invites get None
+    assert drop.db_claim_invite("claim", "s1") == "s1"
+    assert drop.db_claim_invite("claim", "s2") is None
+    assert drop.db_claim_invite("deleted", "s1") is None